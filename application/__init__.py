@@ -1,6 +1,7 @@
 import sys
 import os
 import json
+import atexit
 import numpy as np
 
 from flask import Flask, render_template, url_for, request, jsonify, Response
@@ -9,6 +10,7 @@ from flask import Flask, render_template, url_for, request, jsonify, Response
 
 ### Initialize Modules ###
 from .common.database import Database
+from .common.logger import getLogger
 from .config import SECRETKEY
 from .config import SIMCOLLECTION
 from .config import DESIGNSCOLLECTION
@@ -16,6 +18,9 @@ from .config import LOGCOLLECTION
 
 from .models.simulation.views import dt_blueprint
 
+### Optimizer and simulation progress is logged below the package logger ###
+logger = getLogger(__name__)
+
 ### Initialize Flask ###
 application = Flask(__name__)
 application.secret_key = SECRETKEY
@@ -44,6 +49,16 @@ def init_db():
         Database.create_table(table, columns)
         pass
 
+    ### Schema migrations, tracked in PRAGMA user_version ###
+    migrations = [(1, ["CREATE INDEX IF NOT EXISTS idx_{0}_caseid_id ON {0}(caseid, id)".format(DESIGNSCOLLECTION),
+                       "CREATE INDEX IF NOT EXISTS idx_{0}_caseid ON {0}(caseid)".format(LOGCOLLECTION)]),
+                  ]
+
+    Database.migrate(migrations)
+
+### Close pooled DB connections on teardown ###
+atexit.register(Database.close)
+
 ### Home HTML ###
 @application.route('/')
 def home():
@@ -2,11 +2,74 @@ import sqlite3 as lite
 import sys
 import os
 import logging
+import threading
+import time
 
 class Database(object):
 
     PATH2DB = "myDatabase.db"
 
+    ### Connection pool: one connection per thread and process ###
+    POOL = True
+    JOURNALMODE = "WAL"
+    SYNCHRONOUS = "NORMAL"
+    CACHESIZE = -16000
+    TIMEOUT = 30.0
+
+    _local = threading.local()
+    _connections = []
+    _lock = threading.Lock()
+
+    @staticmethod
+    def connect():
+        """Return the pooled connection of the calling thread
+
+        Connections are opened lazily with the configured pragmas and reused
+        for all later calls of the same thread. With POOL=False every call
+        opens a fresh connection.
+
+        Returns:
+            sqlite3.Connection: Connection to PATH2DB
+        """
+        if not Database.POOL:
+            return lite.connect(Database.PATH2DB, timeout=Database.TIMEOUT)
+
+        key = (Database.PATH2DB, os.getpid())
+        con = getattr(Database._local, "connections", {}).get(key)
+        if con is not None:
+            return con
+
+        con = lite.connect(Database.PATH2DB, timeout=Database.TIMEOUT, check_same_thread=False)
+        con.execute("PRAGMA journal_mode={}".format(Database.JOURNALMODE))
+        con.execute("PRAGMA synchronous={}".format(Database.SYNCHRONOUS))
+        con.execute("PRAGMA cache_size={}".format(Database.CACHESIZE))
+
+        if not hasattr(Database._local, "connections"):
+            Database._local.connections = {}
+        Database._local.connections[key] = con
+
+        with Database._lock:
+            ### Close connections left behind by finished threads ###
+            for thread, other in [c for c in Database._connections if not c[0].is_alive()]:
+                other.close()
+                Database._connections.remove((thread, other))
+            Database._connections.append((threading.current_thread(), con))
+
+        return con
+
+    @staticmethod
+    def close():
+        """Close all pooled connections (e.g. on application teardown)
+        """
+        with Database._lock:
+            for thread, con in Database._connections:
+                try:
+                    con.close()
+                except lite.Error as e:
+                    logging.warning("{}".format(e))
+            Database._connections = []
+        Database._local = threading.local()
+
     @staticmethod
     def _checkIfTableExists(tablename):
         """Check whether a table exists or not
@@ -17,7 +80,7 @@ class Database(object):
         Returns:
             TYPE: Description
         """
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
 
         try:
             with con:
@@ -36,7 +99,7 @@ class Database(object):
     def delete_table(tablename):
         """
         """
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
         try:
             with con:
                 # From the connection, we get the cursor object. The cursor is used
@@ -62,7 +125,7 @@ class Database(object):
         columns = ["{} {}".format(key, columnsdict[key]) for key in columnsdict.keys()]
 
         if not Database._checkIfTableExists(tablename):
-            con = lite.connect(Database.PATH2DB)
+            con = Database.connect()
             try:
                 with con:
                     # From the connection, we get the cursor object. The cursor is used
@@ -80,6 +143,68 @@ class Database(object):
             logging.info("Table {} already exists. Reusing...".format(tablename))
         return False
 
+    @staticmethod
+    def create_index(tablename, columns, indexname=None):
+        """
+        Create index if it does not exist
+        Database.create_index("cars", ["name", "price"])
+        """
+        indexname = "idx_{}_{}".format(tablename, "_".join(columns)) if indexname is None else indexname
+        con = Database.connect()
+        try:
+            with con:
+                cur = con.cursor()
+                cur.execute("CREATE INDEX IF NOT EXISTS {} ON {}({})".format(indexname, tablename, ", ".join(columns)))
+                return True
+        except lite.Error as e:
+            logging.warning("{}".format(e))
+        except Exception as e:
+            logging.warning("{}".format(e))
+        return False
+
+    @staticmethod
+    def getSchemaVersion():
+        """
+        Schema version stored in PRAGMA user_version
+        """
+        con = Database.connect()
+        try:
+            cur = con.cursor()
+            cur.execute("PRAGMA user_version")
+            return cur.fetchone()[0]
+        except lite.Error as e:
+            logging.warning("{}".format(e))
+        return 0
+
+    @staticmethod
+    def migrate(migrations):
+        """
+        Apply all migrations newer than the stored schema version, each in one transaction
+        migrations = [(1, ["CREATE INDEX IF NOT EXISTS idx_cars_name ON cars(name)"])]
+        """
+        version = Database.getSchemaVersion()
+
+        con = Database.connect()
+        for target, statements in sorted(migrations, key=lambda m: m[0]):
+            if target <= version:
+                continue
+            ### sqlite3 opens no implicit transaction for DDL and PRAGMA, so BEGIN explicitly ###
+            try:
+                cur = con.cursor()
+                cur.execute("BEGIN")
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute("PRAGMA user_version = {}".format(int(target)))
+                con.commit()
+                logging.info("Migrated schema to version {}.".format(target))
+                version = target
+            except lite.Error as e:
+                if con.in_transaction:
+                    con.rollback()
+                logging.warning("{}".format(e))
+                return False
+        return True
+
     @staticmethod
     def insertMany(tablename, rows, columnNames=None):
         """
@@ -92,7 +217,7 @@ class Database(object):
             return
 
         placeholder = ', '.join(len(rows[0]) * ['?'])
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
 
         try:
             with con:
@@ -113,7 +238,7 @@ class Database(object):
     def insertManyInChunks(tablename, rows, columnNames, chunksize=200):
         if len(rows[0])< 999:
             logging.info("This is unnecessary! Use insertMany instead")
-            return Database.insertMany(tablename, rows, columns)
+            return Database.insertMany(tablename, rows, columnNames)
 
         for start in range(0, len(rows[0]), chunksize):
             end = start+chunksize if start+chunksize< len(rows[0]) else len(rows[0])
@@ -131,7 +256,7 @@ class Database(object):
             logging.info("Nothing to insert!")
             return
 
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
         for row in rows:
             placeholders = ', '.join(['?' for key, val in row.items()])
             vals = [val for key, val in row.items()]
@@ -161,7 +286,7 @@ class Database(object):
             keys.append("{} = ?".format(key))
             vals.append(val)
 
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
         try:
             with con:
                 cur = con.cursor()
@@ -180,11 +305,11 @@ class Database(object):
         """
         Get ColumnsNames of DB
         """
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
         try:
             with con:
-                con.row_factory = lite.Row
                 cur = con.cursor()
+                cur.row_factory = lite.Row
                 cur.execute("SELECT * FROM {}".format(tablename))
                 return cur.fetchone().keys()
 
@@ -202,16 +327,19 @@ class Database(object):
         return keys, vals
 
     @staticmethod
-    def find(tablename, variables=None, query=None, one=False, distinct=False):
+    def find(tablename, variables=None, query=None, one=False, distinct=False, orderBy=None, limit=None):
         """Summary
 
         Args:
             tablename (TYPE): Description
             query (TYPE): Description
+            orderBy (str): Column (optionally with ASC/DESC) to sort by
+            limit (int): Maximum number of rows
 
         Returns:
             TYPE: Description
         """
+        keys, vals = [], []
         if not query is None:
             keys, vals = Database._queryProcessor(query)
         if variables is None:
@@ -224,15 +352,22 @@ class Database(object):
         else:
             distinct = ""
 
-        con = lite.connect(Database.PATH2DB)
+        suffix = ""
+        if not orderBy is None:
+            suffix += " ORDER BY {}".format(orderBy)
+        if not limit is None:
+            suffix += " LIMIT ?"
+            vals = vals + [int(limit)]
+
+        con = Database.connect()
         try:
             with con:
-                con.row_factory = lite.Row
                 cur = con.cursor()
+                cur.row_factory = lite.Row
                 if not query is None:
-                    cur.execute("SELECT {} {} FROM {} WHERE {}".format(distinct, ', '.join(variables), tablename, ' AND '.join(keys)), vals)
+                    cur.execute("SELECT {} {} FROM {} WHERE {}{}".format(distinct, ', '.join(variables), tablename, ' AND '.join(keys), suffix), vals)
                 else:
-                    cur.execute("SELECT {} {} FROM {}".format(distinct, ', '.join(variables), tablename))
+                    cur.execute("SELECT {} {} FROM {}{}".format(distinct, ', '.join(variables), tablename, suffix), vals)
 
                 if one:
                     return dict(cur.fetchone())
@@ -255,7 +390,7 @@ class Database(object):
         """
         keys, vals = Database._queryProcessor(query)
 
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
         try:
             with con:
                 cur = con.cursor()
@@ -277,7 +412,7 @@ class Database(object):
             TYPE: Description
         """
 
-        con = lite.connect(Database.PATH2DB)
+        con = Database.connect()
         try:
             with con:
 
@@ -291,6 +426,69 @@ class Database(object):
             logging.warning("{}".format(e))
 
 
+### Buffers rows and writes them with executemany in one transaction ###
+class BufferedWriter(object):
+
+    def __init__(self, tablename, columnNames, maxRows=1000, maxDelay=5.0):
+        """
+        Rows are flushed once maxRows are buffered, once maxDelay seconds
+        passed since the last flush, or on close()
+        writer = BufferedWriter("cars", ["name", "price"])
+        writer.add([{"name": "Audi", "price": 3000}])
+        """
+        self.tablename = tablename
+        self.columnNames = list(columnNames)
+        self.maxRows = maxRows
+        self.maxDelay = maxDelay
+
+        self.pid = os.getpid()
+        self.rows = []
+        self.lastFlush = time.time()
+        self._lock = threading.Lock()
+
+    ### Copies sent to other processes start empty and flush on every add ###
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["rows"], state["_lock"] = [], None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, rows):
+        """
+        Buffer a list of dictionaries
+        """
+        with self._lock:
+            self.rows.extend([tuple(row.get(key) for key in self.columnNames) for row in rows])
+            due = len(self.rows) >= self.maxRows or time.time()-self.lastFlush >= self.maxDelay
+
+        if due or os.getpid() != self.pid:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered rows, returns False (and keeps the rows) if the insert failed
+        """
+        with self._lock:
+            rows, self.rows = self.rows, []
+            self.lastFlush = time.time()
+
+        if len(rows) == 0:
+            return True
+
+        ### Rows of a failed insert go back to the front of the buffer for the next flush ###
+        if not Database.insertMany(self.tablename, rows, columnNames=self.columnNames):
+            with self._lock:
+                self.rows = rows + self.rows
+            return False
+        return True
+
+    def close(self):
+        return self.flush()
+
+
 # if __name__ == "__main__":
 
 #     columns = {"id": "INTEGER PRIMARY KEY AUTOINCREMENT", "name": "TEXT", "price": "INT"}
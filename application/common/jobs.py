@@ -0,0 +1,132 @@
+import threading
+import queue
+import uuid
+import datetime
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+### Background job with status, progress and cooperative cancellation ###
+class Job(object):
+
+    QUEUED, RUNNING, FINISHED, FAILED, CANCELLED = "queued", "running", "finished", "failed", "cancelled"
+
+    def __init__(self, fct, name=None, caseid=None, instrumentation=None):
+        self.id = uuid.uuid4().hex
+        self.fct = fct
+        self.name = name
+        self.caseid = caseid
+        self.status = Job.QUEUED
+        self.progress = 0.0
+        self.error = None
+        self.created = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        self.started, self.finished = None, None
+        self._cancel = threading.Event()
+
+        ### Optional object with a snapshot() method, e.g. the timers of an optimization ###
+        self.instrumentation = instrumentation
+
+    @property
+    def done(self):
+        return self.status in [Job.FINISHED, Job.FAILED, Job.CANCELLED]
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    ### Report progress in [0, 1], returns False once the job was cancelled ###
+    def update(self, progress):
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        return not self.cancelled
+
+    def cancel(self):
+        self._cancel.set()
+        if self.status == Job.QUEUED:
+            self.status = Job.CANCELLED
+
+    ### Run the job function, called by a worker thread ###
+    def run(self):
+        if self.cancelled:
+            self.status = Job.CANCELLED
+            return
+
+        self.status = Job.RUNNING
+        self.started = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        try:
+            self.fct(self)
+            self.status = Job.CANCELLED if self.cancelled else Job.FINISHED
+            if self.status == Job.FINISHED:
+                self.progress = 1.0
+        except Exception as e:
+            logger.exception("Job {} failed".format(self.id))
+            self.status, self.error = Job.FAILED, "{}".format(e)
+        self.finished = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+    ### TO json ###
+    def json(self):
+        return {"id": self.id,
+                "name": self.name,
+                "caseid": self.caseid,
+                "status": self.status,
+                "progress": self.progress,
+                "error": self.error,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished}
+
+
+### FIFO job queue served by a pool of worker threads ###
+class JobQueue(object):
+
+    def __init__(self, nworkers=2, maxHistory=100):
+        self.nworkers = nworkers
+        self.maxHistory = maxHistory
+        self.jobs = {}
+        self._queue = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    ### Workers are started on the first submit ###
+    def _startWorkers(self):
+        while len(self._workers) < self.nworkers:
+            worker = threading.Thread(target=self._work, name="job-worker-{}".format(len(self._workers)), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                job.run()
+            finally:
+                self._queue.task_done()
+
+    ### Queue fct(job) and return the job ###
+    def submit(self, fct, name=None, caseid=None, instrumentation=None):
+        job = Job(fct, name=name, caseid=caseid, instrumentation=instrumentation)
+
+        with self._lock:
+            self._startWorkers()
+            self.jobs[job.id] = job
+
+            ### Forget the oldest finished jobs ###
+            finished = [j for j in self.jobs.values() if j.done]
+            for old in finished[:max(0, len(self.jobs)-self.maxHistory)]:
+                del self.jobs[old.id]
+
+        self._queue.put(job)
+        return job
+
+    def get(self, jobid):
+        return self.jobs.get(jobid)
+
+    def find(self, caseid=None):
+        return [job for job in list(self.jobs.values()) if caseid is None or str(job.caseid) == str(caseid)]
+
+    def cancel(self, jobid):
+        job = self.get(jobid)
+        if job is not None:
+            job.cancel()
+        return job
@@ -1,11 +1,19 @@
 import logging
+import threading
 
-### Setup logging ###
+_lock = threading.Lock()
+
+### Setup logging, the handler is added on the first call per name only, records do not reach the root logger twice ###
 def getLogger(name):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter('[%(asctime)-8s] [%(name)-8s] [%(levelname)-1s] [%(message)s]')
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
-    return logger
\ No newline at end of file
+    with _lock:
+        if logger.handlers:
+            return logger
+
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        formatter = logging.Formatter('[%(asctime)-8s] [%(name)-8s] [%(levelname)-1s] [%(message)s]')
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        logger.addHandler(stream_handler)
+    return logger
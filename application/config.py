@@ -1,4 +1,10 @@
 SECRETKEY = "1337"
 SIMCOLLECTION = "simulations"
 DESIGNSCOLLECTION = "designs"
-LOGCOLLECTION = "logs"
\ No newline at end of file
+LOGCOLLECTION = "logs"
+JOBWORKERS = 2
+SIMCACHESIZE = 4096
+SIMCACHEDISK = False
+RENDERWORKERS = 2
+CHECKPOINTINTERVAL = 1
+CHECKPOINTDIR = ".checkpoints"
@@ -1,6 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import pickle
 
 from .optimizer import Optimizer
 from .pareto import Pareto
@@ -22,15 +20,16 @@ class ACO(Optimizer):
     ### Iterate ###
     def iterate(self, itermax):
 
-        x = Optimizer._dimensionalize(np.random.rand(self.colonySize, self.xdim), self.xlb, self.xub )
+        x = Optimizer._dimensionalize(self.rng.random((self.colonySize, self.xdim)), self.xlb, self.xub )
         
         ### Start iterating ###
         for n in range(itermax):
             self.currentIteration += 1
-            print(" Episode : {}".format(self.currentIteration))
 
             ### Evaluate it ###
             y, c, p = self.evaluate(x)
+            ### Only true evaluations compete for the archive ###
+            x, y, p = x[self.evaluated], y[self.evaluated], p[self.evaluated]
 
             ### Append value to so far best seen designs ###
             xNorm = Optimizer._nondimensionalize(np.vstack((x, self.xbest)), self.xlb, self.xub )
@@ -38,11 +37,12 @@ class ACO(Optimizer):
             p = np.vstack((p, self.pbest))
 
             ### Pareto Ranks ###
-            ranks = Pareto.computeParetoRanks(yNorm+p)
-            idxs = np.argsort(ranks)
+            with self.instrumentation.timer("rank"):
+                ranks, _ = Pareto.nonDominatedSort(yNorm+p)
+                idxs = np.argsort(ranks, kind='stable')
 
-            ### Sort according to ranks ###
-            xNorm, yNorm, ranks, p = xNorm[idxs, :], yNorm[idxs, :], ranks[idxs], p[idxs]
+                ### Sort according to ranks ###
+                xNorm, yNorm, ranks, p = xNorm[idxs, :], yNorm[idxs, :], ranks[idxs], p[idxs]
 
             self.xbest = Optimizer._dimensionalize(xNorm[:self.archiveSize,:], self.xlb, self.xub )
             self.ybest = Optimizer._dimensionalize(yNorm[:self.archiveSize,:], self.ylb, self.yub )
@@ -54,24 +54,50 @@ class ACO(Optimizer):
             p = omega/np.sum(omega)
 
             ### Build new solution ###
-            x = np.zeros((self.colonySize, self.xdim))
-
-            for l in range(self.colonySize):
-                for i in range(self.xdim):
-                    j = np.random.choice(np.arange(self.archiveSize), p=p)
-                    Sji = self.xbest[j,:][i]
-                    sigma = self.eps*np.sum(np.abs(self.xbest[j,i]-self.xbest[:,i]))
-
-                    ### Sample from normal distribution ###
-                    x[l,i] = Sji + sigma*np.random.normal()
-                    if x[l,i]>self.xub[i]:
-                        x[l,i]=self.xub[i]
-                    elif x[l,i]<self.xlb[i]:
-                        x[l,i]=self.xlb[i]
+            with self.instrumentation.timer("variation"):
+                x = self.construct(p)
 
             ### Store ###
-            Optimizer.store([self.currentIteration, self.xbest, self.ybest])
+            self.store()
+
+            ### Report progress ###
+            if not self.notify():
+                break
+
+    ### Sample the colony, one archive kernel per ant and dimension ###
+    def construct(self, p):
+        dims = np.arange(self.xdim)
+        sigma = self.eps*ACO.absoluteDeviationSums(self.xbest)
+
+        j = self.rng.choice(self.xbest.shape[0], size=(self.colonySize, self.xdim), p=p)
+        x = self.xbest[j, dims] + sigma[j, dims]*self.rng.standard_normal((self.colonySize, self.xdim))
+
+        return np.clip(x, self.xlb, self.xub)
+
+    ### sum_k |X[j,i]-X[k,i]| for every j and i, O(n log n) per column via sorting ###
+    @staticmethod
+    def absoluteDeviationSums(X):
+        n = X.shape[0]
+        order = np.argsort(X, axis=0)
+        Xs = np.take_along_axis(X, order, axis=0)
+        below = np.cumsum(Xs, axis=0) - Xs
+        above = np.sum(Xs, axis=0) - below - Xs
+
+        k = np.arange(n).reshape(-1,1)
+        sums = np.zeros(X.shape)
+        np.put_along_axis(sums, order, Xs*k - below + above - Xs*(n-1-k), axis=0)
+        return sums
+
+    ### Archive penalties are part of the backup ###
+    def state(self):
+        state = super().state()
+        state["pbest"] = self.pbest
+        return state
+
+    def setState(self, state):
+        super().setState(state)
+        self.pbest = state["pbest"]
 
     ### Restart algorithm ###
     def restart(self):
-        [self.currentIteration, self.xbest, self.ybest] = Optimizer.load()
+        self.load()
@@ -0,0 +1,146 @@
+import numpy as np
+
+from .pareto import Pareto
+
+
+### Epsilon-box archive, at most one design per box of the normalized objective space ###
+class EpsilonArchive(object):
+
+    def __init__(self, xdim, ylb, yub, nbins=6, capacity=64):
+        self.ylb, self.yub = np.asarray(ylb, dtype=float), np.asarray(yub, dtype=float)
+        self.bins = np.linspace(0, 1, nbins)
+
+        ### Box indices run from 0 to nbins, hashed into one integer ###
+        assert (nbins+1)**self.ylb.shape[0] < 2**63, "Too many boxes for {} objectives".format(self.ylb.shape[0])
+        self.strides = (nbins+1)**np.arange(self.ylb.shape[0], dtype=np.int64)
+
+        ### Box hash -> slot, slots are reused when a box gets a better design ###
+        self.boxes = {}
+        self.size = 0
+        self._x = np.zeros((capacity, xdim))
+        self._y = np.zeros((capacity, self.ylb.shape[0]))
+        self._dist = np.zeros(capacity)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def x(self):
+        return self._x[:self.size]
+
+    @property
+    def y(self):
+        return self._y[:self.size]
+
+    ### Box hash and squared distance to the lower box corner of each row ###
+    def boxIndex(self, Y):
+        Y = (np.asarray(Y, dtype=float).reshape(-1, self.ylb.shape[0]) - self.ylb) / (self.yub - self.ylb)
+        inds = np.digitize(Y, self.bins)
+        lower = self.bins[np.clip(inds-1, 0, self.bins.shape[0]-1)]
+        return inds.astype(np.int64) @ self.strides, np.sum((Y-lower)**2, axis=1)
+
+    ### Insert a batch, the design closest to the lower box corner keeps the box ###
+    def add(self, X, Y):
+        X = np.asarray(X, dtype=float).reshape(-1, self._x.shape[1])
+        Y = np.asarray(Y, dtype=float).reshape(-1, self._y.shape[1])
+        if X.shape[0] == 0:
+            return
+
+        keys, dist = self.boxIndex(Y)
+
+        ### Best candidate per box within the batch, later rows win ties ###
+        order = np.lexsort((-np.arange(keys.shape[0]), dist, keys))
+        first = np.ones(order.shape[0], dtype=bool)
+        first[1:] = keys[order][1:] != keys[order][:-1]
+        winners = order[first]
+
+        ### One hash lookup per box ###
+        slots = np.asarray([self.boxes.get(key, -1) for key in keys[winners].tolist()], dtype=int)
+
+        ### Occupied boxes, replace on ties as well ###
+        occupied = slots >= 0
+        better = occupied.copy()
+        better[occupied] = dist[winners[occupied]] <= self._dist[slots[occupied]]
+        self._store(slots[better], winners[better], X, Y, dist)
+
+        ### Empty boxes get new slots ###
+        new = winners[~occupied]
+        self._reserve(self.size + new.shape[0])
+        newSlots = np.arange(self.size, self.size + new.shape[0])
+        self.size += new.shape[0]
+        self._store(newSlots, new, X, Y, dist)
+        self.boxes.update(zip(keys[new].tolist(), newSlots.tolist()))
+
+    def _store(self, slots, rows, X, Y, dist):
+        self._x[slots], self._y[slots], self._dist[slots] = X[rows], Y[rows], dist[rows]
+
+    ### Grow the slot arrays geometrically ###
+    def _reserve(self, size):
+        if size > self._x.shape[0]:
+            capacity = max(size, 2*self._x.shape[0])
+            for name in ["_x", "_y", "_dist"]:
+                old = getattr(self, name)
+                new = np.zeros((capacity,) + old.shape[1:])
+                new[:self.size] = old[:self.size]
+                setattr(self, name, new)
+
+    def clear(self):
+        self.boxes = {}
+        self.size = 0
+
+
+### Non-dominated designs of the whole run, at most capacity members ###
+class ParetoArchive(object):
+
+    def __init__(self, xdim, ydim, capacity=100):
+        self.capacity = capacity
+        self.x = np.zeros((0, xdim))
+        self.y = np.zeros((0, ydim))
+        self.f = np.zeros((0, ydim))
+
+    def __len__(self):
+        return self.x.shape[0]
+
+    ### Insert a batch, dominance is decided by F (Y if not given) ###
+    def add(self, X, Y, F=None):
+        X = np.asarray(X, dtype=float).reshape(-1, self.x.shape[1])
+        Y = np.asarray(Y, dtype=float).reshape(-1, self.y.shape[1])
+        F = Y if F is None else np.asarray(F, dtype=float).reshape(-1, self.f.shape[1])
+        if X.shape[0] == 0:
+            return
+
+        ### Only the first front of the batch can enter ###
+        ranks, _ = Pareto.nonDominatedSort(F)
+        X, Y, F = X[ranks == 0], Y[ranks == 0], F[ranks == 0]
+
+        ### Duplicates enter once ###
+        first = np.sort(np.unique(F, axis=0, return_index=True)[1])
+        X, Y, F = X[first], Y[first], F[first]
+
+        ### Candidates covered by a member (or a duplicate of one) are rejected ###
+        covered = np.any(np.all(self.f[None,:,:] <= F[:,None,:], axis=2), axis=1)
+        X, Y, F = X[~covered], Y[~covered], F[~covered]
+
+        ### Members dominated by an accepted candidate are dropped ###
+        dominated = np.any(np.all(F[:,None,:] <= self.f[None,:,:], axis=2) & np.any(F[:,None,:] < self.f[None,:,:], axis=2), axis=0)
+
+        self.x = np.vstack((self.x[~dominated], X))
+        self.y = np.vstack((self.y[~dominated], Y))
+        self.f = np.vstack((self.f[~dominated], F))
+
+        if len(self) > self.capacity:
+            self.prune()
+
+    ### Drop the most crowded members until the capacity is met ###
+    def prune(self):
+        while len(self) > self.capacity:
+
+            ### Half of the excess per pass, one at a time near the capacity ###
+            nremove = max(1, (len(self)-self.capacity)//2)
+            crowding = Pareto.crowdingDistance(self.f)
+            keep = np.sort(np.argsort(-crowding, kind='stable')[:len(self)-nremove])
+
+            self.x, self.y, self.f = self.x[keep], self.y[keep], self.f[keep]
+
+    def clear(self):
+        self.x, self.y, self.f = self.x[:0], self.y[:0], self.f[:0]
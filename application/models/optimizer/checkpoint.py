@@ -0,0 +1,104 @@
+import numpy as np
+import os
+import uuid
+import tempfile
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+### Optimizer state as .npz, written atomically by a background thread ###
+class Checkpoint(object):
+
+    def __init__(self, filename=None, interval=1, directory=None):
+        ### Without filename and directory nothing is written, unnamed checkpoints below directory get a unique name ###
+        if filename is None and directory is not None:
+            filename = ".optimizerBackup_{}.npz".format(uuid.uuid4().hex)
+        self.filename = filename if filename is None or directory is None else os.path.join(directory, filename)
+        self.interval = interval
+        self.lastIteration = None
+
+        ### Newest snapshot not yet on disk, older ones are skipped ###
+        self._pending = None
+        self._writing = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    @property
+    def enabled(self):
+        return self.filename is not None
+
+    ### Snapshot state every interval iterations (or when forced) and return at once ###
+    def save(self, iteration, state, force=False):
+        if not self.enabled or (not force and iteration % self.interval != 0):
+            return False
+
+        snapshot = {name: np.array(value, copy=True) for name, value in state.items()}
+
+        with self._cond:
+            self._pending = snapshot
+            self.lastIteration = iteration
+
+            ### The writer thread exits when idle and is restarted here ###
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="checkpoint-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return True
+
+    def _work(self):
+        while True:
+            with self._cond:
+                if self._pending is None:
+                    self._thread = None
+                    self._cond.notify_all()
+                    return
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+
+            try:
+                self._write(snapshot)
+            except Exception:
+                logger.exception("Writing checkpoint {} failed".format(self.filename))
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    ### Readers see the old or the new file, never a partial one, every write has its own temp file ###
+    def _write(self, snapshot):
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.filename)+".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **snapshot)
+            os.replace(tmp, self.filename)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    ### Wait until the last snapshot is on disk ###
+    def flush(self):
+        with self._cond:
+            while self._pending is not None or self._writing:
+                self._cond.wait()
+
+    def load(self):
+        assert self.enabled, "No checkpoint file, pass a filename or a directory"
+        self.flush()
+        with np.load(self.filename) as data:
+            return {name: data[name] for name in data.files}
+
+    def exists(self):
+        return self.enabled and os.path.isfile(self.filename)
+
+    ### Wait for the writer, remove=True deletes the file of a finished run ###
+    def close(self, remove=False):
+        self.flush()
+        if remove and self.exists():
+            os.remove(self.filename)
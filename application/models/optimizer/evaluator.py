@@ -0,0 +1,82 @@
+import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+### Evaluate one chunk of rows (module level so that it pickles) ###
+def _evaluateChunk(fct, X, kwargs):
+    output = fct(X, **kwargs)
+    return np.asarray(output[0]).reshape(X.shape[0], -1), np.asarray(output[1]).reshape(X.shape[0], -1)
+
+
+### Serial evaluation in the calling thread ###
+class Evaluator(object):
+
+    def __init__(self, nworkers=1, chunksize=None):
+        self.nworkers = 1
+        self.chunksize = chunksize
+
+    ### Evaluate all rows of X ###
+    def __call__(self, fct, X, kwargs):
+        return fct(X, **kwargs)
+
+    ### Release workers ###
+    def close(self):
+        pass
+
+    ### Build an evaluator from its name ###
+    @staticmethod
+    def create(evaluator="serial", nworkers=None, chunksize=None):
+        if isinstance(evaluator, Evaluator):
+            return evaluator
+        if evaluator not in EVALUATORS:
+            raise ValueError("Unknown evaluator '{}', choose from {}".format(evaluator, sorted(EVALUATORS.keys())))
+        return EVALUATORS[evaluator](nworkers=nworkers, chunksize=chunksize)
+
+
+### Chunks the rows of X across a pool of workers ###
+class PoolEvaluator(Evaluator):
+
+    executorClass = None
+
+    def __init__(self, nworkers=None, chunksize=None):
+        self.nworkers = os.cpu_count() if nworkers is None else nworkers
+        self.chunksize = chunksize
+        self.executor = None
+
+    ### Split X into row blocks, one per worker unless chunksize is set ###
+    def chunks(self, X):
+        chunksize = int(np.ceil(X.shape[0]/self.nworkers)) if self.chunksize is None else self.chunksize
+        return [X[i:i+chunksize] for i in range(0, X.shape[0], max(chunksize, 1))]
+
+    ### Evaluate all rows of X, keeping the row order ###
+    def __call__(self, fct, X, kwargs):
+        if X.shape[0] == 0:
+            return fct(X, **kwargs)
+
+        if self.executor is None:
+            self.executor = self.executorClass(max_workers=self.nworkers)
+
+        chunks = self.chunks(X)
+        results = list(self.executor.map(_evaluateChunk, len(chunks)*[fct], chunks, len(chunks)*[kwargs]))
+
+        return np.vstack([r[0] for r in results]), np.vstack([r[1] for r in results])
+
+    ### Release workers ###
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+### Thread pool (fct must release the GIL, e.g. numpy or IO bound) ###
+class ThreadPoolEvaluator(PoolEvaluator):
+    executorClass = ThreadPoolExecutor
+
+
+### Process pool (fct and its kwargs must be picklable) ###
+class ProcessPoolEvaluator(PoolEvaluator):
+    executorClass = ProcessPoolExecutor
+
+
+EVALUATORS = {"serial": Evaluator, "thread": ThreadPoolEvaluator, "process": ProcessPoolEvaluator}
@@ -1,15 +1,19 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import sys
-import pickle
 import functools
+import logging
 
 from .pareto import Pareto
 from .optimizer import Optimizer
 
+
+logger = logging.getLogger(__name__)
+
 class GA(Optimizer):
 
+    STRATEGIES = ["rand/1/bin", "best/1/bin", "current-to-best/1/bin"]
+
     ### Constructor ###
     def __init__(self, fct, xbounds, ybounds, cbounds=[], npop=20, nichingDistanceY=0.1, nichingDistanceX=0.1, 
                  epsDominanceBins=6, **kwargs):
@@ -21,17 +25,19 @@ class GA(Optimizer):
         self.npop = npop
 
     ### Iterate ###
-    def iterate(self, itermax, mut=0.5, crossp=0.7):
+    def iterate(self, itermax, mut=0.5, crossp=0.7, strategy="rand/1/bin"):
+        assert strategy in GA.STRATEGIES, "Unknown DE strategy {}, use one of {}".format(strategy, GA.STRATEGIES)
 
-        x = Optimizer._dimensionalize(np.random.rand(self.npop, self.xdim), self.xlb, self.xub)
+        x = Optimizer._dimensionalize(self.rng.random((self.npop, self.xdim)), self.xlb, self.xub)
 
         ### Start iterating ###
         for n in range(itermax):
             self.currentIteration += 1
-            print(" Episode : {}".format(self.currentIteration))
 
             ### Evaluate it ###
             y, c, p = self.evaluate(x)
+            ### Only true evaluations compete for the archive ###
+            x, y, p = x[self.evaluated], y[self.evaluated], p[self.evaluated]
 
 
             ### Append value to so far best seen designs ###
@@ -40,64 +46,89 @@ class GA(Optimizer):
             p = np.vstack((p, self.pbest))
 
             ### Pareto Ranks ###
-            ranks = Pareto.computeParetoRanks(yNorm+p)
-            idxs = np.argsort(ranks)
+            with self.instrumentation.timer("rank"):
+                ranks, _ = Pareto.nonDominatedSort(yNorm+p)
+                idxs = np.argsort(ranks, kind='stable')
 
-            ### Sort by rank ###
-            xNorm, yNorm, ranks, p = xNorm[idxs, :], yNorm[idxs, :], ranks[idxs], p[idxs]
+                ### Sort by rank ###
+                xNorm, yNorm, ranks, p = xNorm[idxs, :], yNorm[idxs, :], ranks[idxs], p[idxs]
 
             self.xbest = Optimizer._dimensionalize(xNorm[:self.npop,:], self.xlb, self.xub )
             self.ybest = Optimizer._dimensionalize(yNorm[:self.npop,:], self.ylb, self.yub )
             self.pbest = p[:self.npop,:]
 
-            print("mean",x.mean(), "std",x.std())
-            
+            logger.debug("Population mean {:.4f} std {:.4f}".format(x.mean(), x.std()))
 
             ### Differential Evolution ###
-            x = np.zeros((self.npop, self.xdim))
-            for j in range(self.npop):
-                idxs = [i for i in range(xNorm.shape[0]) if i != j]
-                a, b, c = xNorm[np.random.choice(idxs, 3, replace = False)]
-                mutant = np.clip(a + mut * (b - c), 0, 1)
-                cross_points = np.random.rand(self.xdim) < crossp
-                if not np.any(cross_points):
-                    cross_points[np.random.randint(0, self.xdim)] = True
-                x[j,:] = Optimizer._dimensionalize(np.where(cross_points, mutant, xNorm[j,:]), self.xlb, self.xub)
+            with self.instrumentation.timer("variation"):
+                x = Optimizer._dimensionalize(self.evolve(xNorm, ranks, mut, crossp, strategy), self.xlb, self.xub)
 
             #print(x)
             ### Store ###
-            Optimizer.store([self.currentIteration, self.xbest, self.ybest, self.pbest])
+            self.store()
+
+            ### Report progress ###
+            if not self.notify():
+                break
+
+
+    ### Parent penalties are part of the backup ###
+    def state(self):
+        state = super().state()
+        state["pbest"] = self.pbest
+        return state
 
+    def setState(self, state):
+        super().setState(state)
+        self.pbest = state["pbest"]
 
-    ### Epsilon Dominance ###
-    def epsDominance(self):
-        bins = np.linspace(0,1, self.epsDominanceBins)
-        binDistance, index2delete = {}, []
+    ### Restart algorithm, the parents of the last generation are kept ###
+    def restart(self):
+        self.load()
 
-        for n in range(self.ybest.shape[0]):
-            Ydim = Optimizer._nondimensionalize(self.ybest[n,:], self.ylb, self.yub)
-            
-            inds = np.digitize(Ydim, bins)
-            
-            inds_key = '-'.join(map(str,inds))
-            dist = sum([(Ydim[i]-bins[inds[i]-1])**2 for i in range(self.ydim)])
+    ### Trial vectors of the whole population from the rank sorted members xNorm ###
+    def evolve(self, xNorm, ranks, mut=0.5, crossp=0.7, strategy="rand/1/bin"):
+        target = xNorm[:self.npop,:]
 
-            if not inds_key in list(binDistance.keys()):
-                binDistance[inds_key] = [dist, n]
-            else:
-                if binDistance[inds_key][0] < dist:
-                    index2delete.append(n)
-                else:
-                    index2delete.append(binDistance[inds_key][1])
-                    binDistance[inds_key][0] = dist
-                    binDistance[inds_key][1] = n
+        ### Mutation, best is a random member of the first front for every trial ###
+        if strategy == "rand/1/bin":
+            a, b, c = np.moveaxis(xNorm[self.donors(xNorm.shape[0], 3)], 1, 0)
+            mutant = a + mut * (b - c)
+        else:
+            b, c = np.moveaxis(xNorm[self.donors(xNorm.shape[0], 2)], 1, 0)
+            best = xNorm[self.rng.integers(0, np.sum(ranks == 0), self.npop)]
+            base = best if strategy == "best/1/bin" else target + mut * (best - target)
+            mutant = base + mut * (b - c)
+        mutant = np.clip(mutant, 0, 1)
+
+        ### Binomial crossover, at least one component from the mutant ###
+        crossPoints = self.rng.random((self.npop, self.xdim)) < crossp
+        none = np.where(~np.any(crossPoints, axis=1))[0]
+        crossPoints[none, self.rng.integers(0, self.xdim, none.shape[0])] = True
+
+        return np.where(crossPoints, mutant, target)
+
+    ### ndonors distinct member indices per trial vector, none equal to the trial index ###
+    def donors(self, nmembers, ndonors):
+        assert nmembers > ndonors, "DE needs more than {} members, got {}".format(ndonors, nmembers)
+
+        own = np.arange(self.npop).reshape(-1,1)
+        donors = np.zeros((self.npop, ndonors), dtype=int)
+        redraw = np.ones(self.npop, dtype=bool)
+
+        ### Redraw rows with a repeated index, uniform over all valid index sets ###
+        while np.any(redraw):
+            donors[redraw] = self.rng.integers(0, nmembers, (np.sum(redraw), ndonors))
+            taken = np.sort(np.hstack((own, donors)), axis=1)
+            redraw = np.any(taken[:,1:] == taken[:,:-1], axis=1)
+
+        return donors
 
-        self.ybest = np.delete(self.ybest,index2delete,axis=0)
-        self.xbest = np.delete(self.xbest,index2delete,axis=0)
-        
 
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     def de(fobj, bounds, mut=0.8, crossp=0.7, popsize=20, its=1000):
         dimensions = len(bounds)
         pop = np.random.rand(popsize, dimensions)
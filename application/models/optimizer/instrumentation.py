@@ -0,0 +1,71 @@
+import time
+import logging
+import threading
+import contextlib
+
+
+logger = logging.getLogger(__name__)
+
+
+### Per phase timers, counters and an optional event callback, shared by the threads of one run ###
+class Instrumentation(object):
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.started = time.time()
+
+        ### name -> [calls, total seconds, max seconds] ###
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    ### Copies sent to other processes record into their own, discarded, timers ###
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["callback"], state["_lock"] = None, None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.addTime(name, time.perf_counter()-t0)
+
+    def addTime(self, name, seconds):
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    ### Forward an event to the callback, a failing callback does not stop the run ###
+    def event(self, name, **payload):
+        if self.callback is None:
+            return
+        try:
+            self.callback(name, payload)
+        except Exception:
+            logger.exception("Instrumentation callback failed on {}".format(name))
+
+    ### JSON serializable copy of all timers (in ms) and counters ###
+    def snapshot(self):
+        with self._lock:
+            timers = {name: {"calls": calls, "total": 1e3*total, "mean": 1e3*total/calls, "max": 1e3*tmax}
+                      for name, (calls, total, tmax) in self.timers.items()}
+            counters = dict(self.counters)
+        return {"uptime": time.time()-self.started, "timers": timers, "counters": counters}
+
+    def reset(self):
+        with self._lock:
+            self.timers, self.counters = {}, {}
+            self.started = time.time()
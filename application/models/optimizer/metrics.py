@@ -0,0 +1,78 @@
+import numpy as np
+
+from .pareto import Pareto
+
+
+### Quality indicators of a (minimized) front F, one row per design ###
+class Metrics(object):
+
+    ### Dominated volume up to ref, exact for up to 3 objectives, Monte Carlo above ###
+    @staticmethod
+    def hypervolume(F, ref, nsamples=20000, seed=0):
+        F, ref = np.asarray(F, dtype=float), np.asarray(ref, dtype=float)
+        F = F[np.all(F < ref, axis=1)]
+
+        if F.shape[0] == 0:
+            return 0.0
+        if F.shape[1] == 1:
+            return float(ref[0]-F[:,0].min())
+        if F.shape[1] == 2:
+            return Metrics._hypervolume2d(F, ref)
+        if F.shape[1] == 3:
+            return Metrics._hypervolume3d(F, ref)
+
+        ### Fixed seed: successive generations are compared on the same samples ###
+        lb = F.min(axis=0)
+        S = lb[:,None] + np.random.default_rng(seed).random((F.shape[1], nsamples))*(ref-lb)[:,None]
+        dominated = np.zeros(nsamples, dtype=bool)
+
+        ### Objective by objective on contiguous rows, much faster than np.all over short rows ###
+        for f in F[Pareto.nonDominatedSort(F)[1][0]]:
+            inside = S[0] >= f[0]
+            for k in range(1, F.shape[1]):
+                inside &= S[k] >= f[k]
+            dominated |= inside
+        return float(np.prod(ref-lb)*np.count_nonzero(dominated)/nsamples)
+
+    ### Staircase sweep along the first objective ###
+    @staticmethod
+    def _hypervolume2d(F, ref):
+        F = F[np.lexsort((F[:,1], F[:,0]))]
+        front = F[F[:,1] < np.append(np.inf, np.minimum.accumulate(F[:-1,1]))]
+        return float(np.sum((np.append(front[1:,0], ref[0])-front[:,0])*(ref[1]-front[:,1])))
+
+    ### Slices along the third objective, each one a 2-D staircase ###
+    @staticmethod
+    def _hypervolume3d(F, ref):
+        F = F[np.argsort(F[:,2], kind='stable')]
+        depth = np.append(F[1:,2], ref[2])-F[:,2]
+        return float(sum(Metrics._hypervolume2d(F[:n+1,:2], ref[:2])*depth[n] for n in range(F.shape[0]) if depth[n] > 0))
+
+    ### Inverted generational distance: mean distance of the reference front to F ###
+    @staticmethod
+    def igd(F, reference):
+        F, reference = np.asarray(F, dtype=float), np.asarray(reference, dtype=float)
+        if F.shape[0] == 0:
+            return np.inf
+        return float(np.mean(np.sqrt(np.min(np.sum((reference[:,None,:]-F[None,:,:])**2, axis=2), axis=1))))
+
+    ### Generalized spread, 0 for an evenly spaced front reaching the reference extremes ###
+    @staticmethod
+    def spread(F, reference=None):
+        F = np.asarray(F, dtype=float)
+        if F.shape[0] < 2:
+            return np.nan
+
+        D = np.sqrt(np.sum((F[:,None,:]-F[None,:,:])**2, axis=2))
+        np.fill_diagonal(D, np.inf)
+        d = D.min(axis=1)
+
+        ### Distance of the reference extremes (best point per objective) to F ###
+        extremes = 0.0
+        if reference is not None:
+            reference = np.asarray(reference, dtype=float)
+            E = reference[np.argmin(reference, axis=0)]
+            extremes = np.sum(np.sqrt(np.min(np.sum((E[:,None,:]-F[None,:,:])**2, axis=2), axis=1)))
+
+        denominator = extremes + F.shape[0]*d.mean()
+        return float((extremes + np.sum(np.abs(d-d.mean())))/denominator) if denominator > 0 else 0.0
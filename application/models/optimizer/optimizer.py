@@ -1,21 +1,41 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 import sys
-import pickle
 import functools
+import json
+import logging
 
 from .pareto import Pareto
+from .evaluator import Evaluator
+from .archive import EpsilonArchive
+from .archive import ParetoArchive
+from .checkpoint import Checkpoint
+from .surrogate import SURROGATES
+from .metrics import Metrics
+from .instrumentation import Instrumentation
+
+
+logger = logging.getLogger(__name__)
 
 
 ### Generic Optimizer class ###
 class Optimizer(object):
 
+    ### Columns of the per iteration history ###
+    METRICS = ["iteration", "evaluations", "hypervolume", "igd", "spread"]
+
     ### Constructor ###
-    def __init__(self, fct, xbounds, ybounds, cbounds=[], epsDominanceBins=None, **kwargs):
+    def __init__(self, fct, xbounds, ybounds, cbounds=[], epsDominanceBins=None, paretoCapacity=100, evaluator="serial", nworkers=None, callback=None,
+                 checkpoint=None, checkpointInterval=1, checkpointDirectory=None, seed=None, surrogate=None, surrogateFraction=0.25,
+                 referenceFront=None, hypervolumeReference=None, stagnationWindow=None, stagnationTolerance=1e-3,
+                 instrumentation=None, eventCallback=None, **kwargs):
 
         self.fct = fct
         self.currentIteration = 0
+
+        ### All draws of a run come from one Generator, seed=None picks fresh entropy ###
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seedSequence)
         self.xdim = len(xbounds)
         self.ydim = len(ybounds)
         self.cdim = len(cbounds)
@@ -39,31 +59,150 @@ class Optimizer(object):
 
         ### Eps dominace ###
         self.epsDominanceBins = epsDominanceBins
+        self.archive = EpsilonArchive(self.xdim, self.ylb, self.yub, nbins=epsDominanceBins) if epsDominanceBins else None
+
+        ### Non-dominated designs of all evaluations, crowding pruned to paretoCapacity ###
+        self.paretoArchive = ParetoArchive(self.xdim, self.ydim, capacity=paretoCapacity)
 
         ### Keywordarguments ###
         self.kwargs = kwargs
 
+        ### Evaluation backend (serial, thread or process) ###
+        self.evaluator = Evaluator.create(evaluator, nworkers=nworkers)
+
+        ### Called as callback(optimizer) after every iteration ###
+        self.callback = callback
+
+        ### Optional surrogate model, only surrogateFraction of each generation is evaluated by fct ###
+        self.surrogate = SURROGATES[surrogate]() if isinstance(surrogate, str) else surrogate
+        self.surrogateFraction = surrogateFraction
+        self.nEvaluations = 0
+        self.evaluated = np.zeros(0, dtype=bool)
+
+        ### Convergence metrics of the normalized feasible front, a reference front (in y units) enables IGD ###
+        self.referenceFront = None if referenceFront is None else Optimizer._nondimensionalize(np.asarray(referenceFront, dtype=float).reshape(-1, self.ydim), self.ylb, self.yub)
+        self.hypervolumeReference = 1.1*np.ones(self.ydim) if hypervolumeReference is None else np.asarray(hypervolumeReference, dtype=float)
+        self.history = np.zeros((0, len(Optimizer.METRICS)))
+
+        ### Stop once the hypervolume gained over stagnationWindow iterations is below stagnationTolerance (relative) ###
+        self.stagnationWindow = stagnationWindow
+        self.stagnationTolerance = stagnationTolerance
+
+        ### Per run backup file, written every checkpointInterval iterations if checkpoint or checkpointDirectory is given ###
+        self.checkpoint = Checkpoint(checkpoint, interval=checkpointInterval, directory=checkpointDirectory)
+
+        ### Phase timers and counters, events go to eventCallback(event, payload) ###
+        self.instrumentation = Instrumentation(callback=eventCallback) if instrumentation is None else instrumentation
+
 
     ### Evaluate function ###
     def evaluate(self, X):
+        ### Rows of the last call that were evaluated by fct ###
+        self.evaluated = np.ones(X.shape[0], dtype=bool)
+
+        if self.surrogate is None or not self.surrogate.ready:
+            return self.evaluateTrue(X)
+
+        ### Pre-screen all rows with the surrogate ###
+        with self.instrumentation.timer("surrogate"):
+            Xnorm = Optimizer._nondimensionalize(X, self.xlb, self.xub)
+            YC = self.surrogate.predict(Xnorm)
+            Y, C = YC[:,:self.ydim], YC[:,self.ydim:]
+            P = self.penalty(X, Y, C)
+
+            ### Infill: best predicted ranks, far from known samples first ###
+            ranks, _ = Pareto.nonDominatedSort(Optimizer._nondimensionalize(Y, self.ylb, self.yub)+P)
+            order = np.lexsort((-self.surrogate.distance(Xnorm), ranks))
+            index = order[:int(np.ceil(self.surrogateFraction*X.shape[0]))]
+        self.instrumentation.count("predicted", X.shape[0]-index.shape[0])
+
+        Y[index], C[index], P[index] = self.evaluateTrue(X[index])
+        self.evaluated[:] = False
+        self.evaluated[index] = True
+        return Y, C, P
+
+    ### Evaluate with fct, the results update the Pareto archive and the surrogate ###
+    def evaluateTrue(self, X):
         ### Evaluate toolchain ###
-        output = self.fct(X, **self.kwargs)
+        with self.instrumentation.timer("evaluate"):
+            output = self.evaluator(self.fct, X, self.kwargs)
         Y = output[0].reshape(X.shape[0], self.ydim)
         C = output[1].reshape(X.shape[0], self.cdim) if self.cdim>0 else np.zeros((X.shape[0], self.cdim))
+        P = self.penalty(X, Y, C)
+        self.nEvaluations += X.shape[0]
+        self.instrumentation.count("evaluations", X.shape[0])
+        self.instrumentation.count("penalized", np.count_nonzero(P[:,0] > 0))
 
+        ### Every evaluated design is offered to the Pareto archive ###
+        with self.instrumentation.timer("archive"):
+            self.paretoArchive.add(X, Y, Optimizer._nondimensionalize(Y, self.ylb, self.yub)+P)
 
-        ### Build penalty function ###
-        Py = Optimizer.boundaryCheck(Y, self.ylb, self.yub)
-        Px = Optimizer.boundaryCheck(X, self.xlb, self.xub)
-        Pc = Optimizer.boundaryCheck(C, self.clb, self.cub)
-        P  = (Py+Px+Pc)
+        if self.surrogate is not None:
+            self.surrogate.add(Optimizer._nondimensionalize(X, self.xlb, self.xub), np.hstack((Y, C)))
 
         ### Return to optimizer ###
         return Y, C, P
 
+    ### Build penalty function ###
+    def penalty(self, X, Y, C):
+        Py = Optimizer.boundaryCheck(Y, self.ylb, self.yub)
+        Px = Optimizer.boundaryCheck(X, self.xlb, self.xub)
+        Pc = Optimizer.boundaryCheck(C, self.clb, self.cub)
+        return (Py+Px+Pc)
+
     ### Initialize ###
     def initialize(self):
         self.currentIteration = 0
+        self.history = np.zeros((0, len(Optimizer.METRICS)))
+
+    ### Report an iteration, a callback returning False or a stagnated front stops iterating ###
+    def notify(self):
+        metrics = self.record()
+        self.instrumentation.count("iterations")
+        self.instrumentation.event("iteration", **metrics)
+        logger.info("Iteration {iteration:.0f}: {evaluations:.0f} evaluations, hypervolume {hypervolume:.4f}".format(**metrics))
+
+        proceed = self.callback is None or self.callback(self) is not False
+
+        if proceed and self.stagnated():
+            logger.info("Front stagnated after {} iterations, stopping".format(self.currentIteration))
+            self.instrumentation.event("stagnated", **metrics)
+            return False
+        return proceed
+
+    ### Normalized objectives of the feasible Pareto archive members ###
+    def front(self):
+        F = Optimizer._nondimensionalize(self.paretoArchive.y, self.ylb, self.yub)
+        return F[np.all(self.paretoArchive.f == F, axis=1)]
+
+    ### Append the metrics of the current front to the history, once per iteration ###
+    def record(self):
+        if self.history.shape[0] > 0 and self.history[-1,0] == self.currentIteration:
+            return dict(zip(Optimizer.METRICS, self.history[-1]))
+
+        with self.instrumentation.timer("metrics"):
+            F = self.front()
+            row = [self.currentIteration, self.nEvaluations,
+                   Metrics.hypervolume(F, self.hypervolumeReference),
+                   Metrics.igd(F, self.referenceFront) if self.referenceFront is not None else np.nan,
+                   Metrics.spread(F, self.referenceFront)]
+        self.history = np.vstack((self.history, row))
+        return dict(zip(Optimizer.METRICS, row))
+
+    ### Relative hypervolume gain over the last stagnationWindow iterations ###
+    def stagnated(self):
+        if self.stagnationWindow is None or self.history.shape[0] <= self.stagnationWindow:
+            return False
+        hv = self.history[:, Optimizer.METRICS.index("hypervolume")]
+        return hv[-1] > 0 and hv[-1]-hv[-1-self.stagnationWindow] <= self.stagnationTolerance*hv[-1]
+
+    ### Shut down evaluation workers, the checkpoint of a finished run is removed ###
+    ### keepCheckpoint=True saves the iterations after the last checkpoint for a restart instead ###
+    def close(self, keepCheckpoint=False):
+        self.evaluator.close()
+        if keepCheckpoint and self.currentIteration > 0 and self.checkpoint.lastIteration != self.currentIteration:
+            self.store(force=True)
+        self.checkpoint.close(remove=not keepCheckpoint)
 
     ### Check boundary violation and penalizis it ###
     @staticmethod
@@ -74,31 +213,18 @@ class Optimizer(object):
         return np.sum(Y**2,axis=1).reshape(-1,1) 
 
 
-    ### Epsilon Dominance ###
-    def epsDominance(self):
-        bins = np.linspace(0,1, self.epsDominanceBins)
-        binDistance, index2delete = {}, []
-
-        for n in range(self.ybest.shape[0]):
-            Ydim = Optimizer._nondimensionalize(self.ybest[n,:], self.ylb, self.yub)
-            
-            inds = np.digitize(Ydim, bins)
-            
-            inds_key = '-'.join(map(str,inds))
-            dist = sum([(Ydim[i]-bins[inds[i]-1])**2 for i in range(self.ydim)])
-
-            if not inds_key in list(binDistance.keys()):
-                binDistance[inds_key] = [dist, n]
-            else:
-                if binDistance[inds_key][0] < dist:
-                    index2delete.append(n)
-                else:
-                    index2delete.append(binDistance[inds_key][1])
-                    binDistance[inds_key][0] = dist
-                    binDistance[inds_key][1] = n
-
-        self.ybest = np.delete(self.ybest,index2delete,axis=0)
-        self.xbest = np.delete(self.xbest,index2delete,axis=0)
+    ### Epsilon Dominance, adds X, Y to the eps-box archive or re-filters xbest, ybest ###
+    def epsDominance(self, X=None, Y=None):
+        if self.archive is None:
+            return
+
+        if X is None:
+            self.archive.clear()
+            X, Y = self.xbest, self.ybest
+
+        with self.instrumentation.timer("archive"):
+            self.archive.add(X, Y)
+            self.xbest, self.ybest = self.archive.x.copy(), self.archive.y.copy()
         
 
     @staticmethod
@@ -109,16 +235,33 @@ class Optimizer(object):
     def _dimensionalize(x, lb, ub):
         return lb + x * (ub - lb)
 
-    ### Restart ###
-    @staticmethod
-    def load(filename=".optimizerBackup.pkl"):
-        with open(filename,'rb') as f1:
-            datalist = pickle.load(f1)
-        return datalist
+    ### Independent child Generators, e.g. one per parallel worker ###
+    def spawn(self, n):
+        return [np.random.default_rng(seq) for seq in self.seedSequence.spawn(n)]
+
+    ### Arrays saved in checkpoints, subclasses add their own ###
+    def state(self):
+        return {"currentIteration": self.currentIteration,
+                "rngState": json.dumps(self.rng.bit_generator.state),
+                "nEvaluations": self.nEvaluations, "history": self.history,
+                "xbest": self.xbest, "ybest": self.ybest,
+                "paretoX": self.paretoArchive.x, "paretoY": self.paretoArchive.y, "paretoF": self.paretoArchive.f}
+
+    def setState(self, state):
+        self.currentIteration = int(state["currentIteration"])
+        self.rng.bit_generator.state = json.loads(str(state["rngState"]))
+        self.nEvaluations, self.history = int(state["nEvaluations"]), state["history"]
+        self.xbest, self.ybest = state["xbest"], state["ybest"]
+        self.paretoArchive.x, self.paretoArchive.y, self.paretoArchive.f = state["paretoX"], state["paretoY"], state["paretoF"]
 
     ### Backup ###
-    @staticmethod
-    def store(datalist, filename=".optimizerBackup.pkl"):
-        with open(filename,'wb') as f1:
-            pickle.dump(datalist,f1)
+    def store(self, force=False):
+        self.record()
+        if not self.checkpoint.enabled:
+            return False
+        with self.instrumentation.timer("checkpoint"):
+            return self.checkpoint.save(self.currentIteration, self.state(), force=force)
 
+    ### Restart ###
+    def load(self):
+        self.setState(self.checkpoint.load())
@@ -1,51 +1,191 @@
 import numpy as np
+import bisect
 
 
 ### Pareto Class ###
 class Pareto(object):
 
     @staticmethod
-    def cull(pts, dominates):
-        dominated, cleared = [], []
-        remaining = pts
+    def dominates(row, rowCandidate):
+        return all(r <= rc for r, rc in zip(row, rowCandidate))
+
+
+    ### Non-dominated sorting, returns ranks and fronts (lists of row indices) ###
+    @staticmethod
+    def nonDominatedSort(Y):
+        Y = np.asarray(Y, dtype=float)
+        Y = Y.reshape(-1, 1) if Y.ndim == 1 else Y
+
+        if Y.shape[0] == 0:
+            return np.zeros(0, dtype=int), []
+
+        if Y.shape[1] == 1:
+            ranks = np.unique(Y[:,0], return_inverse=True)[1].reshape(-1)
+        elif Y.shape[1] == 2:
+            ranks = Pareto._sweep2d(Y)
+        elif Y.shape[1] == 3:
+            ranks = Pareto._sweep3d(Y)
+        else:
+            ranks = Pareto._efficientNonDominatedSort(Y)
+
+        ### Front membership by index ###
+        order = np.argsort(ranks, kind='stable')
+        fronts = np.split(order, np.cumsum(np.bincount(ranks))[:-1])
+
+        return ranks, fronts
+
+
+    ### O(N log N) sweep for two objectives ###
+    @staticmethod
+    def _sweep2d(Y):
+        order = np.lexsort((Y[:,1], Y[:,0]))
+        ranks = np.zeros(Y.shape[0], dtype=int)
 
-        while remaining:
-            candidate = remaining[0]
-            new_remaining = []
-            for other in remaining[1:]:
-                [new_remaining, dominated][Pareto.dominates(candidate, other)].append(other)
-            if not any(Pareto.dominates(other, candidate) for other in new_remaining):
-                cleared.append(candidate)   # PARETO POINT
+        ### f2 of the last member of each front, non-decreasing with the front index ###
+        tails = []
+        previous = None
+
+        for i in order:
+            f1, f2 = Y[i,0], Y[i,1]
+
+            ### Duplicates share the front of their twin ###
+            if previous is not None and Y[previous,0] == f1 and Y[previous,1] == f2:
+                ranks[i] = ranks[previous]
+                continue
+
+            ### First front whose last member has a larger f2 ###
+            k = bisect.bisect_right(tails, f2)
+            if k == len(tails):
+                tails.append(f2)
             else:
-                dominated.append(candidate)
-            remaining = new_remaining
-        return cleared, dominated
+                tails[k] = f2
+
+            ranks[i] = k
+            previous = i
+
+        return ranks
 
+
+    ### Sweep over f1 for three objectives, each front keeps a (f2, f3) staircase ###
     @staticmethod
-    def dominates(row, rowCandidate):
-        return all(r <= rc for r, rc in zip(row, rowCandidate))
+    def _sweep3d(Y):
+        order = np.lexsort((Y[:,2], Y[:,1], Y[:,0]))
+        ranks = np.zeros(Y.shape[0], dtype=int)
+
+        ### Per front: f2 strictly increasing, f3 strictly decreasing ###
+        stairs2, stairs3 = [], []
+        previous = None
+
+        for i in order:
+            f2, f3 = Y[i,1], Y[i,2]
+
+            if previous is not None and np.all(Y[previous,:] == Y[i,:]):
+                ranks[i] = ranks[previous]
+                continue
+
+            ### Every front member precedes y, so (f2, f3) dominance decides ###
+            lo, hi = 0, len(stairs2)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                j = bisect.bisect_right(stairs2[mid], f2) - 1
+                if j >= 0 and stairs3[mid][j] <= f3:
+                    lo = mid + 1
+                else:
+                    hi = mid
+
+            if lo == len(stairs2):
+                stairs2.append([])
+                stairs3.append([])
+
+            ### Insert and drop the members that y now covers ###
+            s2, s3 = stairs2[lo], stairs3[lo]
+            start = bisect.bisect_left(s2, f2)
+            end = start
+            while end < len(s2) and s3[end] >= f3:
+                end += 1
+            s2[start:end], s3[start:end] = [f2], [f3]
+
+            ranks[i] = lo
+            previous = i
+
+        return ranks
+
+
+    ### Efficient non-dominated sort with binary search over the fronts (ENS-BS) ###
+    @staticmethod
+    def _efficientNonDominatedSort(Y):
+        order = np.lexsort(Y.T[::-1])
+        ranks = np.zeros(Y.shape[0], dtype=int)
+
+        ### Members of every front without f1, stored in growing arrays ###
+        fronts, sizes = [], []
+        previous = None
+
+        for i in order:
+            y = Y[i,1:]
+
+            if previous is not None and np.all(Y[previous,:] == Y[i,:]):
+                ranks[i] = ranks[previous]
+                continue
+
+            ### Being dominated by front k implies being dominated by every front before k ###
+            lo, hi = 0, len(fronts)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if np.any(np.all(fronts[mid][:sizes[mid],:] <= y, axis=1)):
+                    lo = mid + 1
+                else:
+                    hi = mid
+
+            if lo == len(fronts):
+                fronts.append(np.zeros((16, y.shape[0])))
+                sizes.append(0)
+            elif sizes[lo] == fronts[lo].shape[0]:
+                fronts[lo] = np.vstack((fronts[lo], np.zeros(fronts[lo].shape)))
+
+            fronts[lo][sizes[lo],:] = y
+            sizes[lo] += 1
+            ranks[i] = lo
+            previous = i
+
+        return ranks
+
+
+    ### NSGA-II crowding distance, boundary members get inf ###
+    @staticmethod
+    def crowdingDistance(Y):
+        Y = np.asarray(Y, dtype=float)
+        Y = Y.reshape(-1, 1) if Y.ndim == 1 else Y
+        if Y.shape[0] < 3:
+            return np.full(Y.shape[0], np.inf)
+
+        order = np.argsort(Y, axis=0, kind='stable')
+        Ys = np.take_along_axis(Y, order, axis=0)
+        span = Ys[-1,:]-Ys[0,:]
+        span[span == 0] = 1.0
+
+        ### Normalized gap between the two neighbours along every objective ###
+        gaps = np.full(Y.shape, np.inf)
+        gaps[1:-1,:] = (Ys[2:,:]-Ys[:-2,:])/span
+
+        distance = np.zeros(Y.shape)
+        np.put_along_axis(distance, order, gaps, axis=0)
+        return np.sum(distance, axis=1)
 
 
     @staticmethod
     def computeParetoOptimalMember(Y, index=None):
         index = np.arange(0,Y.shape[0]) if index is None else np.asarray(index)
 
-        Ypareto, Ydominated = Pareto.cull(Y.tolist(), Pareto.dominates)
-        paretoIndex = [index[np.all(Y == ypareto, axis=1)][0]    for i, ypareto    in enumerate(Ypareto)]
-        dominatedIndex = [i for i in index if not i in paretoIndex]
+        ranks, _ = Pareto.nonDominatedSort(Y)
+        paretoIndex = index[ranks == 0].tolist()
+        dominatedIndex = index[ranks > 0].tolist()
 
         return paretoIndex, dominatedIndex
 
 
     @staticmethod
     def computeParetoRanks(Y):
-        indexunranked = np.arange(0,Y.shape[0])
-        ranks = 99*np.ones(Y.shape[0])
-        paretoRank = 0
-        while len(indexunranked) > 0:
-            paretoIndex, indexunranked = Pareto.computeParetoOptimalMember(Y[indexunranked,:], index=indexunranked)
-            ranks[paretoIndex] = paretoRank
-            paretoRank += 1
-
+        ranks, _ = Pareto.nonDominatedSort(Y)
         return ranks
 
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+### Cubic radial basis function model with a linear tail, inputs in [0, 1] ###
+class RBFSurrogate(object):
+
+    def __init__(self, maxSamples=500, minSamples=None, smoothing=1e-8):
+        self.maxSamples = maxSamples
+        self.minSamples = minSamples
+        self.smoothing = smoothing
+
+        self.X, self.Y = None, None
+        self._dirty = True
+
+    ### Enough distinct samples for the linear tail plus a few centers ###
+    @property
+    def ready(self):
+        if self.X is None:
+            return False
+        minSamples = 2*(self.X.shape[1]+1) if self.minSamples is None else self.minSamples
+        return self.X.shape[0] >= minSamples
+
+    ### Add true evaluations, the most recent maxSamples are kept ###
+    def add(self, X, Y):
+        X, Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float).reshape(X.shape[0], -1)
+        finite = np.all(np.isfinite(Y), axis=1)
+        X = X[finite] if self.X is None else np.vstack((self.X, X[finite]))
+        Y = Y[finite] if self.Y is None else np.vstack((self.Y, Y[finite]))
+
+        ### Duplicates make the interpolation matrix singular, keep the last one ###
+        _, last = np.unique(X[::-1], axis=0, return_index=True)
+        keep = np.sort(X.shape[0]-1-last)[-self.maxSamples:]
+
+        self.X, self.Y = X[keep], Y[keep]
+        self._dirty = True
+
+    def fit(self):
+        n, d = self.X.shape
+        self.mean, self.std = self.Y.mean(axis=0), self.Y.std(axis=0)
+        self.std[self.std == 0] = 1.0
+
+        A = np.zeros((n+d+1, n+d+1))
+        A[:n,:n] = self.kernel(self.X, self.X) + self.smoothing*np.eye(n)
+        A[:n,n:] = self.tail(self.X)
+        A[n:,:n] = A[:n,n:].T
+
+        rhs = np.zeros((n+d+1, self.Y.shape[1]))
+        rhs[:n] = (self.Y-self.mean)/self.std
+
+        try:
+            self.weights = np.linalg.solve(A, rhs)
+        except np.linalg.LinAlgError:
+            self.weights = np.linalg.lstsq(A, rhs, rcond=None)[0]
+        self._dirty = False
+
+    def predict(self, X):
+        if self._dirty:
+            self.fit()
+        X = np.asarray(X, dtype=float)
+        Z = self.kernel(X, self.X) @ self.weights[:self.X.shape[0]] + self.tail(X) @ self.weights[self.X.shape[0]:]
+        return self.mean + Z*self.std
+
+    ### Distance of every row of X to its nearest sample ###
+    def distance(self, X):
+        return np.sqrt(np.min(np.sum((X[:,None,:]-self.X[None,:,:])**2, axis=2), axis=1))
+
+    @staticmethod
+    def kernel(X, C):
+        return np.sqrt(np.sum((X[:,None,:]-C[None,:,:])**2, axis=2))**3
+
+    @staticmethod
+    def tail(X):
+        return np.hstack((np.ones((X.shape[0], 1)), X))
+
+
+SURROGATES = {"rbf": RBFSurrogate}
@@ -1,22 +1,40 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import pickle
 
 from .optimizer import Optimizer
-from .pareto import Pareto
 
 
 
-### Particle Swarm Optimizer ###
+### Particle Swarm Optimizer, the swarm state is held as one array per quantity ###
 class Swarm(Optimizer):
 
+    ### Per particle arrays of the swarm state ###
+    STATE = ["x", "v", "xpbest", "xgbest", "y", "ypbest", "ygbest", "resetCtr"]
+
     def __init__(self, fct, xbounds, ybounds, cbounds=[], nparticles=10, nichingDistanceY=0.1, nichingDistanceX=0.1, 
                  epsDominanceBins=6, minimumSwarmSize=10, **kwargs):
         super().__init__(fct, xbounds, ybounds, cbounds=cbounds, epsDominanceBins=epsDominanceBins, **kwargs)
 
+        ### Particle parameters ###
+        self.w = 0.5
+        self.c1 = 0.5
+        self.c2 = 0.5
+        self.resetLimit = 12
+        self.mutateRate = 0.03
+
+        ### Initialize swarm, normalized design space ###
+        self.x = self.rng.random((nparticles, self.xdim))
+        self.v = 0.5*(-1.0 + 2.0*self.rng.random((nparticles, self.xdim)))
+        self.xpbest = self.x.copy()
+        self.xgbest = np.full((nparticles, self.xdim), np.nan)
+
+        ### Objectives, NaN until the first evaluation ###
+        self.y = np.full((nparticles, self.ydim), np.nan)
+        self.ypbest = np.full((nparticles, self.ydim), np.nan)
+        self.ygbest = np.full((nparticles, self.ydim), np.nan)
+
+        ### Iterations without a new pbest ###
+        self.resetCtr = np.zeros(nparticles, dtype=int)
 
-        ### Initialize swarm ###
-        self.particles = [Particle(self.xdim, pid, vinitScale=0.5) for pid in range(nparticles)]
         self.xbest, self.ybest = np.zeros((0, self.xlb.shape[0])), np.zeros((0, self.ylb.shape[0]))
         self.minimumSwarmSize = minimumSwarmSize
         self.particleReductionRate = 0.99
@@ -29,8 +47,12 @@ class Swarm(Optimizer):
     ### swarm size ###
     @property
     def swarmSize(self):
-        return len(self.particles)
-    
+        return self.x.shape[0]
+
+    ### Particle views on the swarm arrays ###
+    @property
+    def particles(self):
+        return [Particle(self, pid) for pid in range(self.swarmSize)]
 
     ### Iterate ###
     def iterate(self, itermax):
@@ -38,126 +60,131 @@ class Swarm(Optimizer):
         ### Start iterating ###
         for n in range(itermax):
             self.currentIteration += 1
-            print(" Episode : {}".format(self.currentIteration))
 
             ### Remove particles ###
             SwarmSizeTarget = int(self.particleReductionRate*self.swarmSize) if self.swarmSize > self.minimumSwarmSize else self.minimumSwarmSize
-            while self.swarmSize > SwarmSizeTarget:
-                self.particles.pop()
+            if self.swarmSize > SwarmSizeTarget:
+                self.shrink(SwarmSizeTarget)
 
             ### Evaluate the new particle's position ###
-            x = np.asarray([Optimizer._dimensionalize(particle.x, self.xlb, self.xub) for particle in self.particles])
+            x = Optimizer._dimensionalize(self.x, self.xlb, self.xub)
 
             ### Evaluate it ###
             y, c, p = self.evaluate(x)
 
             ### Update particle targets ###
-            for i, particle in enumerate(self.particles):
-                particle.y = Optimizer._nondimensionalize(y[i, :], self.ylb, self.yub) + p[i,:]
-
-            ### Determine new pbest ###
-            [particle.updatePersonalBest() for particle in self.particles]
+            self.y = Optimizer._nondimensionalize(y, self.ylb, self.yub) + p
 
-            ### Determine new gbest ###
-            paretoIndex, _ = Pareto.computeParetoOptimalMember(Optimizer._nondimensionalize(y, self.ylb, self.yub)+p)
+            with self.instrumentation.timer("rank"):
+                ### Determine new pbest ###
+                self.updatePersonalBest()
 
-            for i, particle in enumerate(self.particles):
-                idx = np.random.choice(paretoIndex, 1, replace=False)[0]
-                particle.xgbest = Optimizer._nondimensionalize(x[idx, :], self.xlb, self.xub)
-                particle.ygbest = Optimizer._nondimensionalize(y[idx, :], self.ylb, self.yub)
+                ### Determine new gbest, leaders are drawn from the Pareto archive ###
+                idx = self.rng.integers(0, len(self.paretoArchive), self.swarmSize)
+                self.xgbest = Optimizer._nondimensionalize(self.paretoArchive.x[idx, :], self.xlb, self.xub)
+                self.ygbest = Optimizer._nondimensionalize(self.paretoArchive.y[idx, :], self.ylb, self.yub)
 
-            ### Apply eps dominance ###
-            self.epsDominance()
+            ### Apply eps dominance to the feasible, truly evaluated designs ###
+            feasible = (p[:,0] == 0) & self.evaluated
+            self.epsDominance(x[feasible], y[feasible])
 
             ### Update particles ###
-            [particle.update() for particle in self.particles]
+            with self.instrumentation.timer("variation"):
+                self.update()
 
             ### Store ###
-            Optimizer.store([self.currentIteration, self.particles, self.xbest, self.ybest])
-
-
-    ### Restart algorithm ###
-    def restart(self, resetParticles=False):
-        [self.currentIteration, self.particles, self.xbest, self.ybest] = Optimizer.load()
-        if resetParticles:
-            [particle.reset() for particle in self.particles]
-
-
-
-
-### Particle ###
-class Particle(object):
-    """docstring for Particle"""
-    def __init__(self, xdim, particleID, vinitScale=0.1, mutateRate=0.03):
-
-        self.particleID = particleID
-        self.w = 0.5
-        self.c1 = 0.5
-        self.c2 = 0.5
-        self.xdim = xdim
-
-        self.x = np.random.rand(self.xdim)
-        self.v = vinitScale*(-1.0 + 2.0*np.random.rand(self.xdim))
-        self.xpbest = self.x.copy()
-        self.xgbest = None
+            self.store()
 
-        ### Objectives ###
-        self.y = None
-        self.ypbest = None
-        self.ygbest = None
+            ### Report progress ###
+            if not self.notify():
+                break
 
-        ### Reset Counter ###
-        self.resetCtr = 0
-        self.resetLimit = 12
+    ### Keep the first nparticles particles ###
+    def shrink(self, nparticles):
+        for name in Swarm.STATE:
+            setattr(self, name, getattr(self, name)[:nparticles])
 
-        ### Mutation rate ###
-        self.mutateRate = mutateRate
+    ### Reset position and velocity of the selected particles (all by default) ###
+    def reset(self, index=None):
+        index = np.ones(self.swarmSize, dtype=bool) if index is None else index
+        nreset = np.count_nonzero(index) if np.asarray(index).dtype == bool else len(index)
 
-    ### reset ###
-    def reset(self):
-        self.x = np.random.rand(self.xdim)
-        self.v = 1.0*(-1.0 + 2.0*np.random.rand(self.xdim))
-        self.resetCtr = 0
+        self.x[index] = self.rng.random((nreset, self.xdim))
+        self.v[index] = 1.0*(-1.0 + 2.0*self.rng.random((nreset, self.xdim)))
+        self.resetCtr[index] = 0
 
     ### find pbest ###
     def updatePersonalBest(self):
 
-        ### Initialization ###
-        if self.ypbest is None:
-            self.ypbest = self.y
-            self.xpbest = self.x
-            self.resetCtr = 0
-            return
+        ### First evaluation or Pareto dominance, surrogate predictions never become a pbest ###
+        better = np.all(np.isnan(self.ypbest), axis=1) | np.all(self.y <= self.ypbest, axis=1)
+        better &= self.evaluated
 
-        ### Pareto dominance ###
-        if Pareto.dominates(self.y, self.ypbest):
-            self.ypbest = self.y
-            self.xpbest = self.x
-            self.resetCtr = 0
-            return
+        self.ypbest[better] = self.y[better]
+        self.xpbest[better] = self.x[better]
+        self.resetCtr[better] = 0
 
         ### If non of the above cases match ###
-        self.resetCtr += 1
-        return
+        self.resetCtr[~better & self.evaluated] += 1
 
-    ### Update the Particle's position ###
+    ### Update the particle positions ###
     def update(self):
 
-        r1 = np.random.rand()
-        r2 = np.random.rand()
+        r1 = self.rng.random((self.swarmSize, 1))
+        r2 = self.rng.random((self.swarmSize, 1))
 
         ### Update particle velocity ###
         self.v = self.w * self.v + self.c1*r1*(self.xpbest - self.x) + self.c2*r2*(self.xgbest - self.x)
-        self.x += self.v
+        self.x = self.x + self.v
 
         ### Mutation ###
-        if np.random.rand() < self.mutateRate: 
-            self.x = np.random.rand(self.xdim)
+        mutate = self.rng.random(self.swarmSize) < self.mutateRate
+        self.x[mutate] = self.rng.random((np.count_nonzero(mutate), self.xdim))
 
         ### If pbest hasn't changed ###
-        if self.resetCtr > self.resetLimit:
-            self.reset()
+        self.reset(self.resetCtr > self.resetLimit)
 
         ### Design space violation ###
-        self.x[self.x>1.0] = 1.0
-        self.x[self.x<0.0] = 0.0
+        np.clip(self.x, 0.0, 1.0, out=self.x)
+
+    ### Swarm arrays for backups ###
+    def state(self):
+        state = super().state()
+        state.update({name: getattr(self, name) for name in Swarm.STATE})
+        return state
+
+    def setState(self, state):
+        super().setState(state)
+        for name in Swarm.STATE:
+            setattr(self, name, state[name])
+
+    ### Restart algorithm ###
+    def restart(self, resetParticles=False):
+        self.load()
+        self.epsDominance()
+        if resetParticles:
+            self.reset()
+
+
+### Particle, a view on one row of the swarm arrays ###
+class Particle(object):
+
+    def __init__(self, swarm, particleID):
+        object.__setattr__(self, "swarm", swarm)
+        object.__setattr__(self, "particleID", particleID)
+
+    def __getattr__(self, name):
+        if name in Swarm.STATE:
+            return getattr(self.swarm, name)[self.particleID]
+        if name in ["w", "c1", "c2", "xdim", "resetLimit", "mutateRate"]:
+            return getattr(self.swarm, name)
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name not in Swarm.STATE:
+            raise AttributeError("Particle views only write swarm state, got {}".format(name))
+        getattr(self.swarm, name)[self.particleID] = value
+
+    ### reset ###
+    def reset(self):
+        self.swarm.reset([self.particleID])
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+from ...common.database import Database
+
+
+### Bounded LRU cache for solver results with an optional SQLite tier ###
+class ResultCache(object):
+
+    COLUMNS = ["lift", "drag", "cl", "cd"]
+
+    def __init__(self, maxsize=4096, resolution=1e-9, disk=False, tablename="simcache"):
+        self.maxsize = maxsize
+        self.resolution = resolution
+        self.disk = disk
+        self.tablename = tablename
+
+        self.hits, self.misses, self.diskHits = 0, 0, 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._diskReady = False
+
+    ### Quantized key of one design at one operating point ###
+    def key(self, R, a, beta, Uinf, alpha, rho=1.0, grid=()):
+        return tuple(int(round(float(v)/self.resolution)) for v in (R, a, beta, Uinf, alpha, rho)) + tuple(grid)
+
+    ### (lift, drag, cl, cd) or None ###
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._getDisk(key) if self.disk else None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.diskHits += 1
+        self._put(key, value)
+        return value
+
+    def put(self, key, value):
+        value = tuple(float(v) for v in value)
+        self._put(key, value)
+        if self.disk:
+            self._putDisk([(key, value)])
+
+    ### Store many entries, written to disk in one transaction ###
+    def putMany(self, items):
+        items = [(key, tuple(float(v) for v in value)) for key, value in items]
+        for key, value in items:
+            self._put(key, value)
+        if self.disk:
+            self._putDisk(items)
+
+    def _put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    ### Disk tier ###
+    def _prepareDisk(self):
+        if not self._diskReady:
+            columns = {"key": "TEXT"}
+            columns.update({name: "FLOAT" for name in ResultCache.COLUMNS})
+            Database.create_table(self.tablename, columns)
+            Database.create_index(self.tablename, ["key"])
+            self._diskReady = True
+
+    def _getDisk(self, key):
+        self._prepareDisk()
+        row = Database.find(self.tablename, variables=ResultCache.COLUMNS, query={"key": ["=", repr(key)]}, limit=1)
+        if not row:
+            return None
+        return tuple(row[0][name] for name in ResultCache.COLUMNS)
+
+    def _putDisk(self, items):
+        self._prepareDisk()
+        Database.insertMany(self.tablename, [(repr(key),)+value for key, value in items], columnNames=["key"]+ResultCache.COLUMNS)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits, self.misses, self.diskHits = 0, 0, 0
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses, "diskHits": self.diskHits}
@@ -5,16 +5,26 @@ import time
 import numpy as np
 import uuid
 import datetime
+import contextlib
 
 
 from ...common.database import Database
+from ...common.database import BufferedWriter
 from .joukowski import JoukowskiAirfoil
+from .joukowski import JoukowskiBatch
+from .cache import ResultCache
 from ..optimizer.swarm import Swarm
+from ..optimizer.instrumentation import Instrumentation
+from ...config import SIMCACHESIZE, SIMCACHEDISK, CHECKPOINTINTERVAL, CHECKPOINTDIR
 
 
 SIMCOLLECTION = "simulations"
 LOGCOLLECTION = "logs"
 DESIGNSCOLLECTION = "designs"
+DESIGNCOLUMNS = ["caseid", "clop1", "cdop1", "lop1", "dop1", "clop2", "cdop2", "lop2", "dop2", "R", "a", "beta"]
+
+### Solver results shared by all cases ###
+RESULTCACHE = ResultCache(maxsize=SIMCACHESIZE, disk=SIMCACHEDISK)
 
 class Simulation(JoukowskiAirfoil):
     def __init__(self, id=None, Uinf=1, R=1.3, a=1.0, alpha=0.0, beta=1.0, rho=1.0, cl=None, cd=None, L=None, D=None, opid=0, analysisid=0):
@@ -89,6 +99,7 @@ class DigitalTwin(object):
         self.U1 = 1 if U1 is None else U1
         self.U2 = 1 if U2 is None else U2
         self.a0, self.R0, self.beta0 = a0, R0, beta0
+        self.simulations = []
 
         if os.path.isdir("./application/static/res/{}".format(self.directory)):
             pass
@@ -134,83 +145,131 @@ class DigitalTwin(object):
         return cls(**Database.find(SIMCOLLECTION, query={"id":["=", caseid]}, one=True))
 
 
-    ### Start the simulation ###
-    def simulate(self, plot=True):
+    ### Start the simulation, render=False leaves the plots to a later call of plot() ###
+    def simulate(self, plot=True, kutta=False, nx=100, render=True):
+
+        ### Without plots only the airfoil surface is needed ###
+        if not plot:
+            res = self.simulateBatch([self.R0], [self.a0], [self.beta0], kutta=kutta, nx=nx)
+            return {name: val[0] for name, val in res.items()}
+
         sim1 = Simulation(Uinf=self.U1, alpha=self.alpha1, beta=self.beta0, a=self.a0, R=self.R0)
         sim2 = Simulation(Uinf=self.U2, alpha=self.alpha2, beta=self.beta0, a=self.a0, R=self.R0)
 
-        sim1.calculateFlowField()
-        sim2.calculateFlowField()
+        sim1.calculateFlowField(nx=nx)
+        sim2.calculateFlowField(nx=nx)
 
-        if plot:
-            sim1.plot_flowfield(store=True, name="./application/static/res/{}/{}".format(self.directory, "flowfield1.png"))
-            sim2.plot_flowfield(store=True, name="./application/static/res/{}/{}".format(self.directory, "flowfield2.png"))
+        self.simulations = [sim1, sim2]
+        if render:
+            self.plot()
 
-            sim1.plot_cp(store=True, name="./application/static/res/{}/{}".format(self.directory, "profile1.png"))
-            sim2.plot_cp(store=True, name="./application/static/res/{}/{}".format(self.directory, "profile2.png"))
+        ### The surface column of the field equals the surface-only solution ###
+        if not kutta:
+            RESULTCACHE.putMany([(RESULTCACHE.key(self.R0, self.a0, self.beta0, Uinf, alpha, sim.rho, grid=(nx, kutta)),
+                                  (sim.lift, sim.drag, sim.lift_coefficient, sim.drag_coefficient))
+                                 for sim, Uinf, alpha in [(sim1, self.U1, self.alpha1), (sim2, self.U2, self.alpha2)]])
 
         return {'LiftOp1': np.around(sim1.lift,6), "ClOp1": np.around(sim1.lift_coefficient,6),
                 "DragOp1": np.around(sim1.drag,6), "CdOp1": np.around(sim1.drag_coefficient,6),
                 "LiftOp2": np.around(sim2.lift,6), "ClOp2": np.around(sim2.lift_coefficient,6),
                 "DragOp2": np.around(sim2.drag,6), "CdOp2": np.around(sim2.drag_coefficient,6)}
 
-    ### Remove from DB ###
-    @staticmethod
-    def remove_from_DB(caseid):
-        return Database.remove(SIMCOLLECTION, query={"id":["=", caseid]})
+    ### Write flowfield and cp plots of the last simulation ###
+    def plot(self):
+        for n, sim in enumerate(self.simulations):
+            sim.plot_flowfield(store=True, name="./application/static/res/{}/flowfield{}.png".format(self.directory, n+1))
+            sim.plot_cp(store=True, name="./application/static/res/{}/profile{}.png".format(self.directory, n+1))
 
-    ### Setup ###
-    @staticmethod
-    def optimize(caseid, xbounds, itermax, swarmsize, targets, constraints):
-        ### Get Case ###
-        dt = DigitalTwin.find_by_id(caseid)
+    ### Coefficients of many designs at both operating points in one call ###
+    def simulateBatch(self, R, a, beta, kutta=False, nx=100, rho=1.0, instrumentation=None):
+        R, a, beta = np.asarray(R, dtype=float), np.asarray(a, dtype=float), np.asarray(beta, dtype=float)
+        ops = [(self.U1, self.alpha1), (self.U2, self.alpha2)]
 
-        ### Fitness function ###
-        def fitness(x, dt, constraints, targets, caseid):
-            y, c = [], []
+        ### Look up every design at every operating point ###
+        keys = [[RESULTCACHE.key(R[n], a[n], beta[n], Uinf, alpha, rho, grid=(nx, kutta)) for Uinf, alpha in ops] for n in range(R.shape[0])]
+        values = np.asarray([[RESULTCACHE.get(key) or 4*(np.nan,) for key in row] for row in keys]).reshape(R.shape[0], len(ops), 4)
 
-            for n in range(x.shape[0]):
-                dt.R0, dt.beta0, dt.a0 = x[n,0], x[n,1], x[n,2]
+        ### Solve the designs with at least one miss ###
+        miss = np.where(np.any(np.isnan(values), axis=(1,2)))[0]
+        if instrumentation is not None:
+            instrumentation.count("cacheHits", R.shape[0]-miss.shape[0])
+            instrumentation.count("cacheMisses", miss.shape[0])
 
-                if dt.a0>=dt.R0:
-                    y.append(len(targets)*[10]) 
-                    c.append(len(constraints)*[10])
-                    continue
+        if miss.shape[0] > 0:
+            sim = JoukowskiBatch(Uinf=[op[0] for op in ops], alpha=[op[1] for op in ops], R=R[miss], a=a[miss], beta=beta[miss], rho=rho)
+            sim.calculateCoefficients(nx=nx, kutta=kutta)
 
-                ### Run simulation ###
-                res = dt.simulate(plot=False)
+            values[miss,:,:] = np.stack((sim.lift, sim.drag, sim.lift_coefficient, sim.drag_coefficient), axis=-1)
+            RESULTCACHE.putMany([(keys[n][m], values[n,m,:]) for n in miss for m in range(len(ops))])
 
-                ### Separate between targets and constraints ###
-                yd, cd = [],[]
-                for name in sorted(list(res.keys())):
-                    if name in list(constraints.keys()):
-                        cd.append(res[name])
-                    elif name in list(targets.keys()):
-                        yd.append(targets[name]["optidir"]*res[name])
+        lift, drag, cl, cd = values[:,:,0], values[:,:,1], values[:,:,2], values[:,:,3]
 
-                y.append(yd)
-                c.append(cd)
+        return {'LiftOp1': np.around(lift[:,0],6), "ClOp1": np.around(cl[:,0],6),
+                "DragOp1": np.around(drag[:,0],6), "CdOp1": np.around(cd[:,0],6),
+                "LiftOp2": np.around(lift[:,1],6), "ClOp2": np.around(cl[:,1],6),
+                "DragOp2": np.around(drag[:,1],6), "CdOp2": np.around(cd[:,1],6)}
 
-                ### Insert design into DB ###
+    ### Remove from DB ###
+    @staticmethod
+    def remove_from_DB(caseid):
+        return Database.remove(SIMCOLLECTION, query={"id":["=", caseid]})
+
+    ### Fitness function (static so that process pools can pickle it) ###
+    @staticmethod
+    def fitness(x, dt, constraints, targets, caseid, writer=None, instrumentation=None):
+        y = 10*np.ones((x.shape[0], len(targets)))
+        c = 10*np.ones((x.shape[0], len(constraints)))
 
-                print([{"id":None, "caseid":caseid, 
-                                                     "clop1": res["ClOp1"], "cdop1": res["CdOp1"], "lop1": res["LiftOp1"], "dop1": res["DragOp1"],
-                                                     "clop2": res["ClOp2"], "cdop2": res["CdOp2"], "lop2": res["LiftOp2"], "dop2": res["DragOp2"],
-                                                     "R": dt.R0, "a": dt.a0, "beta":dt.beta0,
-                                                   }])
+        ### Designs with a>=R are penalized and not simulated ###
+        valid = np.where(x[:,2] < x[:,0])[0]
+        if valid.shape[0] == 0:
+            return y, c
 
-                Database.insert(DESIGNSCOLLECTION, [{"id":None, "caseid":caseid, 
-                                                     "clop1": res["ClOp1"], "cdop1": res["CdOp1"], "lop1": res["LiftOp1"], "dop1": res["DragOp1"],
-                                                     "clop2": res["ClOp2"], "cdop2": res["CdOp2"], "lop2": res["LiftOp2"], "dop2": res["DragOp2"],
-                                                     "R": dt.R0, "a": dt.a0, "beta":dt.beta0,
-                                                   }])
+        ### Run simulation for all valid designs at once ###
+        res = dt.simulateBatch(R=x[valid,0], beta=x[valid,1], a=x[valid,2], instrumentation=instrumentation)
+
+        ### Separate between targets and constraints ###
+        yd, cd = [],[]
+        for name in sorted(list(res.keys())):
+            if name in list(constraints.keys()):
+                cd.append(res[name])
+            elif name in list(targets.keys()):
+                yd.append(targets[name]["optidir"]*res[name])
+
+        if len(yd) > 0:
+            y[valid,:] = np.column_stack(yd)
+        if len(cd) > 0:
+            c[valid,:] = np.column_stack(cd)
+
+        ### Insert designs into DB ###
+        designs = []
+        for i, n in enumerate(valid):
+            design = {"id":None, "caseid":caseid, 
+                      "clop1": res["ClOp1"][i], "cdop1": res["CdOp1"][i], "lop1": res["LiftOp1"][i], "dop1": res["DragOp1"][i],
+                      "clop2": res["ClOp2"][i], "cdop2": res["CdOp2"][i], "lop2": res["LiftOp2"][i], "dop2": res["DragOp2"][i],
+                      "R": x[n,0], "a": x[n,2], "beta": x[n,1],
+                     }
+            designs.append(design)
+
+        with instrumentation.timer("db") if instrumentation is not None else contextlib.nullcontext():
+            if writer is None:
+                Database.insertMany(DESIGNSCOLLECTION, [tuple(d[key] for key in DESIGNCOLUMNS) for d in designs], columnNames=DESIGNCOLUMNS)
+            else:
+                writer.add(designs)
+
+        return y, c
+
+    ### Setup ###
+    @staticmethod
+    def optimize(caseid, xbounds, itermax, swarmsize, targets, constraints, evaluator="serial", nworkers=None, callback=None, seed=None, surrogate=None,
+                 stagnationWindow=None, stagnationTolerance=1e-3, instrumentation=None, runid=None):
+        ### Get Case ###
+        dt = DigitalTwin.find_by_id(caseid)
 
-            return np.asarray(y), np.asarray(c)
-        
         ### Bounds ###
         ybounds, cbounds = [], []
 
-        for name in sorted(['LiftOp1', 'LiftOp1', "DragOp1", "DragOp2"]):
+        for name in sorted(['LiftOp1', 'LiftOp2', "DragOp1", "DragOp2"]):
             if name in list(constraints.keys()):
                 cbounds.append(constraints[name]["bounds"])
             elif name in list(targets.keys()):
@@ -221,13 +280,34 @@ class DigitalTwin(object):
 
 
         ### Start Optimization ##
-        swarm = Swarm(fitness, xbounds, ybounds, cbounds, nparticles=swarmsize, dt=dt, constraints=constraints, targets=targets, caseid=caseid)
-        swarm.initialize()
-        swarm.iterate(itermax)
+        writer = BufferedWriter(DESIGNSCOLLECTION, DESIGNCOLUMNS)
+        instrumentation = Instrumentation() if instrumentation is None else instrumentation
+        swarm = Swarm(DigitalTwin.fitness, xbounds, ybounds, cbounds, nparticles=swarmsize, evaluator=evaluator, nworkers=nworkers, callback=callback,
+                      checkpoint=".optimizerBackup_case{}_{}.npz".format(caseid, runid or uuid.uuid4().hex),
+                      checkpointDirectory=CHECKPOINTDIR, checkpointInterval=CHECKPOINTINTERVAL, seed=seed, surrogate=surrogate,
+                      stagnationWindow=stagnationWindow, stagnationTolerance=stagnationTolerance,
+                      dt=dt, constraints=constraints, targets=targets, caseid=caseid, writer=writer,
+                      instrumentation=instrumentation)
+
+        ### The fitness function counts cache hits and times DB writes on the same instrumentation ###
+        swarm.kwargs["instrumentation"] = instrumentation
+        try:
+            swarm.initialize()
+            swarm.iterate(itermax)
+        except BaseException:
+            ### A failed run keeps its checkpoint for a restart ###
+            swarm.close(keepCheckpoint=True)
+            raise
+        else:
+            swarm.close()
+        finally:
+            with instrumentation.timer("db"):
+                writer.close()
   
 
 
-    ### AJAX plot ####
+    ### AJAX plot, only designs with id > since ####
     @staticmethod
-    def get_opti_data(caseid):
-        return Database.find(DESIGNSCOLLECTION, query={"caseid":["=", caseid]})
\ No newline at end of file
+    def get_opti_data(caseid, since=0, limit=None):
+        return Database.find(DESIGNSCOLLECTION, variables=["id", "lop1", "lop2", "dop1", "dop2", "R", "a", "beta"],
+                             query={"caseid":["=", caseid], "id":[">", since]}, orderBy="id", limit=limit)
\ No newline at end of file
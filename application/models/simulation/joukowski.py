@@ -1,15 +1,20 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import os
 import sys
+import logging
+import threading
+from collections import OrderedDict
 
-from bokeh.models import ColumnDataSource
-from bokeh.io import output_file
-from bokeh.plotting import gridplot,figure, show
-from bokeh.io import output_file
-from bokeh.plotting import gridplot,figure, show
-from bokeh.models import ColumnDataSource,FixedTicker
+
+logger = logging.getLogger(__name__)
+
+
+### Plotting stacks are only imported once a plot is requested ###
+def pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
 
 
 ## http://brennen.caltech.edu/fluidbook/basicfluiddynamics/potentialflow/Complexvariables/joukowskiairfoils.pdf 
@@ -80,50 +85,95 @@ class JoukowskiAirfoil():
     def trafo_joukowski(self, z):
         return z+(self.a**2)/z
 
+    ### Complex potential F(z1) ###
+    def complexPotential(self, z1, z2):
+        return self.Uinf*np.exp(-1j*self.alpha) * (z1 + self.R**2*np.exp(2j*self.alpha)/z1) - 1j*self.gamma/(2*np.pi)*np.log(z2/self.R)
+
+    ### Complex velocity dF/dzeta, dzeta = 1-(a/z)**2 may be precomputed ###
+    def complexVelocity(self, z1, z2, dzeta=None):
+        dzeta = 1-(self.a/self.trafo_z1_to_z(z1))**2 if dzeta is None else dzeta
+        return (self.Uinf*(1-(self.R/z2)**2)-1j*self.gamma/(2*np.pi*z2))*np.exp(-1j*self.alpha)/dzeta
+
     ### Calculate the potential field ###
     def calculateFlowField(self, nx=100, ny=100, nairfoil=300, rfac=6):
 
-        r, phi = np.meshgrid(np.linspace(self.R,rfac*self.R, ny), np.linspace(-np.pi, np.pi, nx))
-        z1 = r*np.cos(phi)+1j*r*np.sin(phi)
-        z2 = self.trafo_z1_to_z2(z1)
-
-        ### The complex flow f(z1) ###
-        self.F = np.zeros(z1.shape, dtype=np.complex)
-        self.V = np.zeros(z1.shape, dtype=np.complex)
-        with np.errstate(divide='ignore'):
-            for m in range(z1.shape[0]):
-                for n in range(z1.shape[1]):
+        ### Grid and mapped coordinates are shared by all operating points ###
+        geo = JoukowskiGeometry.get(self, nx=nx, ny=ny, rfac=rfac, nairfoil=nairfoil)
+        z2 = self.trafo_z1_to_z2(geo.z1)
 
-                    self.F[m,n] = self.Uinf*np.exp(-1j*self.alpha) * (z1[m,n] + self.R**2*np.exp(2j*self.alpha)/z1[m,n]) - 1j*self.gamma/(2*np.pi)*np.log(z2[m,n]/self.R)
-                    self.V[m,n] = (self.Uinf*(1-(self.R/z2[m,n])**2)-1j*self.gamma/(2*np.pi*z2[m,n]))*np.exp(-1j*self.alpha)/(1-(self.a/self.trafo_z1_to_z(z1[m,n]))**2)
+        ### The complex flow f(z1), evaluated on the whole mesh at once ###
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.F = self.complexPotential(geo.z1, z2)
+            self.V = self.complexVelocity(geo.z1, z2, dzeta=geo.dzeta)
 
         ### Joukovski transformation of the z-plane minus the disc D(zc, R) ### 
-        self.zeta = self.trafo_joukowski(self.trafo_z1_to_z(z1))
-        self.xairfoil = self.trafo_joukowski(self.circle(npts=nairfoil))
-        self.chord = self.xairfoil.real.max()-self.xairfoil.real.min()
+        self.zeta = geo.zeta
+        self.xairfoil = geo.xairfoil
+        self.chord = geo.chord
 
         ### Calculate lift and drag ###
-        x = (self.zeta[:,0].real-self.zeta[:,0].real.min())/(self.zeta[:,0].real.max()-self.zeta[:,0].real.min())
-        y = (self.zeta[:,0].imag-self.zeta[:,0].real.min())/(self.zeta[:,0].real.max()-self.zeta[:,0].real.min())
-        cp = 1-(np.absolute(self.V[:,0])/self.Uinf)**2
+        self.lift, self.drag = self.surfaceLoads(self.zeta[:,0], self.V[:,0], metrics=geo.metrics)
+
+    ### Calculate lift and drag from the airfoil surface only ###
+    def calculateCoefficients(self, nx=100, nairfoil=300, kutta=False):
+
+        ### Surface ring r=R of the polar grid used in calculateFlowField ###
+        geo = JoukowskiGeometry.get(self, nx=nx, ny=1, nairfoil=nairfoil)
+        z2 = self.trafo_z1_to_z2(geo.z1)
+
+        ### Keep surface values (nx x 1) so that plot_cp still works ###
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.V = self.complexVelocity(geo.z1, z2, dzeta=geo.dzeta)
 
-        cpm = np.asarray([0.5*(cp[i+1]+cp[i]) for i in range(cp.shape[0]-1)])
-        dx, dy = np.diff(x), np.diff(y)
+        self.F = None
+        self.zeta = geo.zeta
+        self.xairfoil = geo.xairfoil
+        self.chord = geo.chord
+
+        self.lift, self.drag = self.surfaceLoads(self.zeta[:,0], self.V[:,0], metrics=geo.metrics)
+
+        ### Closed-form Kutta-Joukowski lift (L = -rho*Uinf*gamma, scaled like the surface integral) ###
+        if kutta:
+            self.lift = -2*self.gamma/(self.Uinf*self.chord)
+
+    ### Surface tangent terms of the normalized contour (geometry only) ###
+    @staticmethod
+    def surfaceMetrics(zeta):
+        ### Surface points run along the last axis ###
+        xmin, xmax = zeta.real.min(axis=-1, keepdims=True), zeta.real.max(axis=-1, keepdims=True)
+        x = (zeta.real-xmin)/(xmax-xmin)
+        y = (zeta.imag-xmin)/(xmax-xmin)
+
+        dx, dy = np.diff(x, axis=-1), np.diff(y, axis=-1)
         ds = np.sqrt(dx**2+dy**2)
+        return (+dx/ds)*ds, (-dy/ds)*ds
+
+    ### Integrate the surface pressure ###
+    def surfaceLoads(self, zeta, V, metrics=None):
+        tx, ty = self.surfaceMetrics(zeta) if metrics is None else metrics
+        cp = 1-(np.absolute(V)/self.Uinf)**2
 
-        self.drag = np.sum(cpm*(-dy/ds)*ds)
-        self.lift = np.sum(cpm*(+dx/ds)*ds)
+        cpm = 0.5*(cp[...,1:]+cp[...,:-1])
+
+        drag = np.sum(cpm*ty, axis=-1)
+        lift = np.sum(cpm*tx, axis=-1)
+        return lift, drag
 
     ### Plot flowfield ###
     def plot_flowfield(self, returnfig=False, store=False, name="flowfield.png"):
 
-        print("Lift: {:.3f}".format(self.lift))
-        print("CL  : {:.3f}".format(self.lift_coefficient))
+        logger.debug("Lift: {:.3f} CL: {:.3f}".format(self.lift, self.lift_coefficient))
 
         fmax = np.around(np.abs(self.F.imag).max(),2)
         vmax = np.around(np.absolute(self.V).max()/self.Uinf,1)
 
-        fig=plt.figure()
+        ### Stored figures bypass pyplot state so that render workers can run concurrently ###
+        if store:
+            from matplotlib.figure import Figure
+            fig=Figure()
+        else:
+            plt=pyplot()
+            fig=plt.figure()
         ax=fig.add_subplot(111)
         cp=ax.contour(self.zeta.real, self.zeta.imag, self.F.imag,levels=np.linspace(-fmax, fmax, 30).tolist(), colors='blue', linewidths=1, linestyles='solid')# this means that the flow is evaluated at Juc(z) since c_flow(Z)=C_flow(csi(Z))
         #cp=ax.contour(J.real, J.imag, F.real,levels=levels, colors='blue', linewidths=1, linestyles='solid')# this means that the flow is evaluated at Juc(z) since c_flow(Z)=C_flow(csi(Z))
@@ -132,16 +182,15 @@ class JoukowskiAirfoil():
 
         ax.plot(self.xairfoil.real, self.xairfoil.imag)
         ax.set_aspect('equal')
-        plt.axis('off')
+        ax.axis('off')
 
         if store:
-            plt.axis([-4,4,-4,4])
-            plt.savefig(name, bbox_inches='tight')
-            plt.close()
+            ax.axis([-4,4,-4,4])
+            JoukowskiAirfoil.savefig(fig, name)
             return 
 
         if returnfig:
-            plt.axis([-4,4,-4,4])
+            ax.axis([-4,4,-4,4])
             return fig
         else:
             plt.show()
@@ -153,18 +202,32 @@ class JoukowskiAirfoil():
         y = (self.zeta[:,0].imag-self.zeta[:,0].real.min())/(self.zeta[:,0].real.max()-self.zeta[:,0].real.min())
         cp = 1-(np.absolute(self.V[:,0])/self.Uinf)**2
 
-        plt.plot(x,cp)
-        plt.grid(True)
-        plt.xlabel("x/c [-]")
-        plt.ylabel("$c_p$ [-]")
+        if store:
+            from matplotlib.figure import Figure
+            fig=Figure()
+        else:
+            plt=pyplot()
+            fig=plt.figure()
+        ax=fig.add_subplot(111)
+        ax.plot(x,cp)
+        ax.grid(True)
+        ax.set_xlabel("x/c [-]")
+        ax.set_ylabel("$c_p$ [-]")
 
         if store:
-            plt.savefig(name, bbox_inches='tight')
-            plt.close()
+            JoukowskiAirfoil.savefig(fig, name)
             return 
 
         plt.show()
 
+    ### Write to a temporary file first, readers never see a partial image ###
+    @staticmethod
+    def savefig(fig, name):
+        root, ext = os.path.splitext(name)
+        tmp = "{}.{}.tmp{}".format(root, threading.get_ident(), ext)
+        fig.savefig(tmp, bbox_inches='tight')
+        os.replace(tmp, name)
+
 
     ### For Bokeh ###
     @staticmethod
@@ -176,6 +239,9 @@ class JoukowskiAirfoil():
 
     ### Plot flowfield ###
     def plot_flowfield_bokeh(self):
+        from bokeh.io import output_file
+        from bokeh.plotting import figure, show
+
         frame = JoukowskiAirfoil.fig2data(self.plot_flowfield(returnfig=True))
         h,w = frame.shape[0], frame.shape[1]
 
@@ -186,6 +252,91 @@ class JoukowskiAirfoil():
         show(p)  # open a browser
 
 
+### Operating point independent terms of one airfoil on the polar grid ###
+class JoukowskiGeometry(object):
+
+    CACHESIZE = 32
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, airfoil, nx=100, ny=100, rfac=6, nairfoil=300):
+        r, phi = np.meshgrid(np.linspace(airfoil.R,rfac*airfoil.R, ny), np.linspace(-np.pi, np.pi, nx))
+        self.z1 = r*np.cos(phi)+1j*r*np.sin(phi)
+
+        z = airfoil.trafo_z1_to_z(self.z1)
+        self.zeta = airfoil.trafo_joukowski(z)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.dzeta = 1-(airfoil.a/z)**2
+
+        self.xairfoil = airfoil.trafo_joukowski(airfoil.circle(npts=nairfoil))
+        self.chord = self.xairfoil.real.max()-self.xairfoil.real.min()
+        self.metrics = airfoil.surfaceMetrics(self.zeta[:,0])
+
+        ### Shared between solves, so never written to ###
+        for array in [self.z1, self.zeta, self.dzeta, self.xairfoil] + list(self.metrics):
+            array.setflags(write=False)
+
+    ### Cached geometry per (R, a, beta, nx, ny, rfac, nairfoil) ###
+    @classmethod
+    def get(cls, airfoil, nx=100, ny=100, rfac=6, nairfoil=300):
+        key = (float(airfoil.R), float(airfoil.a), float(airfoil.beta), nx, ny, rfac, nairfoil)
+
+        with cls._lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                return cls._cache[key]
+
+        geo = cls(airfoil, nx=nx, ny=ny, rfac=rfac, nairfoil=nairfoil)
+
+        with cls._lock:
+            cls._cache[key] = geo
+            while len(cls._cache) > cls.CACHESIZE:
+                cls._cache.popitem(last=False)
+        return geo
+
+
+### N airfoils x M operating points in one array evaluation ###
+class JoukowskiBatch(JoukowskiAirfoil):
+    def __init__(self, Uinf=[1], R=[1.3], a=[1.0], alpha=[0.0], beta=[1.0], rho=1.0):
+
+        ### Designs along axis 0, operating points along axis 1, surface points along axis 2 ###
+        R = np.asarray(R, dtype=float).reshape(-1,1,1)
+        a = np.asarray(a, dtype=float).reshape(-1,1,1)
+        beta = np.asarray(beta, dtype=float).reshape(-1,1,1)
+        Uinf = np.asarray(Uinf, dtype=float).reshape(1,-1,1)
+        alpha = np.asarray(alpha, dtype=float).reshape(1,-1,1)
+
+        super().__init__(Uinf=Uinf, R=R, a=a, alpha=alpha, beta=beta, rho=rho)
+
+    @property
+    def lift_coefficient(self):
+        return 2*self.lift/(self.rho*self.chord*self.Uinf[...,0]**2)
+
+    @property
+    def drag_coefficient(self):
+        return 2*self.drag/(self.rho*self.chord*self.Uinf[...,0]**2)
+
+    ### Lift and drag (N x M) from the airfoil surfaces ###
+    def calculateCoefficients(self, nx=100, nairfoil=300, kutta=False):
+
+        phi = np.linspace(-np.pi, np.pi, nx)
+        z1 = self.R*np.cos(phi)+1j*self.R*np.sin(phi)
+        z2 = self.trafo_z1_to_z2(z1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.V = self.complexVelocity(z1, z2)
+
+        self.F = None
+        self.zeta = self.trafo_joukowski(self.trafo_z1_to_z(z1))
+        self.xairfoil = self.trafo_joukowski(self.circle(npts=nairfoil))
+        self.chord = self.xairfoil.real.max(axis=-1)-self.xairfoil.real.min(axis=-1)
+
+        self.lift, self.drag = self.surfaceLoads(self.zeta, self.V)
+
+        if kutta:
+            self.lift = -2*self.gamma[...,0]/(self.Uinf[...,0]*self.chord)
+
+
 if __name__ == "__main__":
     sim = JoukowskiAirfoil(Uinf=20, R=1.25, alpha=14.0, beta=20.0, rho=1.0)
     sim.calculateFlowField()
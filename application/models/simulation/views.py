@@ -1,21 +1,51 @@
 from flask import Blueprint, request, session, redirect, url_for, render_template, jsonify
 import numpy as np
 import json
+import threading
 
-from bokeh.io import output_file, show
-from bokeh.models import HoverTool
-from bokeh.plotting import figure
-from bokeh.embed import components
-from bokeh.plotting import figure, show
-from bokeh.models import AjaxDataSource, CustomJS
-from bokeh.embed import components
 
 from ..simulation.digitaltwin import DigitalTwin
 from ..simulation.digitaltwin import DesignLogMessage
+from ..simulation.digitaltwin import RESULTCACHE
+from ..optimizer.instrumentation import Instrumentation
 from ...common.flask_redirect import redirect_url
+from ...common.jobs import JobQueue
+from ...config import JOBWORKERS, RENDERWORKERS
 
 dt_blueprint = Blueprint('simulation', __name__)
 
+### Background optimization jobs ###
+jobs = JobQueue(nworkers=JOBWORKERS)
+
+### Plot rendering, kept off the /simulate request path ###
+renders = JobQueue(nworkers=RENDERWORKERS)
+
+### Per case: newest render generation and a lock, renders of one case never overlap ###
+renderGenerations, renderLocks = {}, {}
+renderLock = threading.Lock()
+
+
+### Queue the plots of dt, older renders of the case are cancelled or skipped ###
+def submitRender(caseid, dt):
+    caseid = str(caseid)
+    with renderLock:
+        generation = renderGenerations[caseid] = renderGenerations.get(caseid, 0) + 1
+        lock = renderLocks.setdefault(caseid, threading.Lock())
+
+    for job in renders.find(caseid=caseid):
+        if job.status == job.QUEUED:
+            job.cancel()
+
+    ### A render already running finishes first, a newer one waits for it ###
+    def render(job):
+        with lock:
+            if renderGenerations[caseid] != generation:
+                job.cancel()
+                return
+            dt.plot()
+
+    return renders.submit(render, name="render", caseid=caseid)
+
 
 ### Run the digital twin ###
 @dt_blueprint.route('/')
@@ -79,20 +109,41 @@ def updateGeometry(caseid):
 @dt_blueprint.route('/simulate/<string:caseid>', methods=['GET', 'POST'])
 def simulate(caseid):
 
+    plot = request.args.get('plot', '1') != '0'
+
     dt = DigitalTwin.find_by_id(caseid)
-    res = dt.simulate()
+    res = dt.simulate(plot=plot, render=False)
+
+    if plot:
+        res["renderjob"] = submitRender(caseid, dt).id
 
     msg = DesignLogMessage(user=request.remote_addr, caseid=caseid, message="Ran simulation")
     msg.store()
 
     return json.dumps(res)
 
+
+### Render status, the plots are up to date once it is finished ###
+@dt_blueprint.route('/render/<string:jobid>')
+def render_status(jobid):
+    job = renders.get(jobid)
+    if job is None:
+        return jsonify(error="Render {} not found".format(jobid)), 404
+    return jsonify(job.json())
+
 ### Start Optimization ###
 @dt_blueprint.route('/optimize/<string:caseid>', methods=['GET', 'POST'])
 def optimize(caseid):
 
     itermax = int(request.args.get('iterMax'))
     swarmsize =  int(request.args.get('swarmsize'))
+    evaluator = request.args.get('evaluator', 'serial')
+    seed = request.args.get('seed')
+    seed = int(seed) if seed else None
+    surrogate = request.args.get('surrogate') or None
+    stagnationWindow = request.args.get('stagnationWindow')
+    stagnationWindow = int(stagnationWindow) if stagnationWindow else None
+    stagnationTolerance = float(request.args.get('stagnationTolerance', 1e-3))
 
     bounds = [(float(request.args.get('Rmin')), float(request.args.get('Rmax'))),
               (float(request.args.get('betamin')), float(request.args.get('betamax'))),
@@ -115,14 +166,60 @@ def optimize(caseid):
         elif t==2:
             constraints[name] = {"bounds": bnds}
 
-    ### Optimize ###
-    dt = DigitalTwin.optimize(caseid, bounds, itermax, swarmsize, targets, constraints)
+    user = request.remote_addr
 
-    ### Store in archive ###
-    msg = DesignLogMessage(user=request.remote_addr, caseid=caseid, message="Ran optimization")
-    msg.store()
+    ### Optimize in the background, the timers are visible while the job is still queued ###
+    def run(job):
+        DigitalTwin.optimize(caseid, bounds, itermax, swarmsize, targets, constraints, evaluator=evaluator, seed=seed, surrogate=surrogate,
+                             stagnationWindow=stagnationWindow, stagnationTolerance=stagnationTolerance, instrumentation=job.instrumentation, runid=job.id,
+                             callback=lambda optimizer: job.update(optimizer.currentIteration/itermax))
 
-    return "Optimization complete!"
+        ### Store in archive ###
+        msg = DesignLogMessage(user=user, caseid=caseid, message="Ran optimization" if not job.cancelled else "Cancelled optimization")
+        msg.store()
+
+    job = jobs.submit(run, name="optimize", caseid=caseid, instrumentation=Instrumentation())
+
+    return jsonify(job.json())
+
+
+### Result cache counters ###
+@dt_blueprint.route('/cache')
+def cache_stats():
+    return jsonify(RESULTCACHE.stats())
+
+
+### Job status ###
+@dt_blueprint.route('/jobs/<string:jobid>')
+def job_status(jobid):
+    job = jobs.get(jobid)
+    if job is None:
+        return jsonify(error="Job {} not found".format(jobid)), 404
+    return jsonify(job.json())
+
+
+### Phase timers (ms) and counters of an optimization job ###
+@dt_blueprint.route('/jobs/<string:jobid>/instrumentation')
+def job_instrumentation(jobid):
+    job = jobs.get(jobid)
+    if job is None or job.instrumentation is None:
+        return jsonify(error="No instrumentation for job {}".format(jobid)), 404
+    return jsonify(job.instrumentation.snapshot())
+
+
+### All jobs of a case ###
+@dt_blueprint.route('/jobs/case/<string:caseid>')
+def case_jobs(caseid):
+    return jsonify(jobs=[job.json() for job in jobs.find(caseid=caseid)])
+
+
+### Cancel job ###
+@dt_blueprint.route('/jobs/<string:jobid>/cancel', methods=['GET', 'POST'])
+def job_cancel(jobid):
+    job = jobs.cancel(jobid)
+    if job is None:
+        return jsonify(error="Job {} not found".format(jobid)), 404
+    return jsonify(job.json())
 
 
 ### Run the digital twin ###
@@ -145,7 +242,21 @@ def run(caseid):
 ### AJAX plot ####
 def make_serverplot_ajax(caseid, plotnames=[['liftOP1', 'liftOP2', 'blue']], xlabel="LiftOp1", ylabel="LiftOp2", title="Lift"):
 
-    source = AjaxDataSource(data_url=request.url_root[:-1]+url_for('simulation.server_load', caseid=caseid), polling_interval=1000)
+    ### Bokeh is only loaded when a page with plots is served ###
+    from bokeh.plotting import figure
+    from bokeh.models import AjaxDataSource, CustomJS
+    from bokeh.embed import components
+
+    ### Append mode: each poll only fetches designs newer than the last received id ###
+    dataurl = request.url_root[:-1]+url_for('simulation.server_load', caseid=caseid)
+    adapter = CustomJS(args=dict(dataurl=dataurl), code="""
+        const data = cb_data.response
+        if (data.id.length > 0) {
+            cb_obj.data_url = dataurl + "?since=" + data.id[data.id.length-1]
+        }
+        return data
+    """)
+    source = AjaxDataSource(data_url=dataurl, polling_interval=1000, mode='append', adapter=adapter)
 
     TOOLTIPS = [
         ("DesignID", "$index"),
@@ -174,9 +285,10 @@ def make_serverplot_ajax(caseid, plotnames=[['liftOP1', 'liftOP2', 'blue']], xla
 @dt_blueprint.route('/opti_data/<string:caseid>', methods=['POST'])
 def server_load(caseid):
 
-    data = DigitalTwin.get_opti_data(caseid)
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+
+    data = DigitalTwin.get_opti_data(caseid, since=since, limit=limit) or []
+    names = {"id": "id", "lop1": "liftOP1", "lop2": "liftOP2", "dop1": "dragOP1", "dop2": "dragOP2", "R": "R", "a": "a", "beta": "beta"}
 
-    return jsonify(liftOP1=[d["lop1"] for d in data], liftOP2=[d["lop2"] for d in data],
-                   dragOP1=[d["dop1"] for d in data], dragOP2=[d["dop2"] for d in data],
-                   id=[d["id"] for d in data], R=[d["R"] for d in data], a=[d["a"] for d in data],
-                   beta=[d["beta"] for d in data]) 
\ No newline at end of file
+    return jsonify(**{names[key]: [d[key] for d in data] for key in names}) 
\ No newline at end of file
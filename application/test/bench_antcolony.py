@@ -0,0 +1,55 @@
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.antcolony import ACO
+from bench_helpers import timeit
+
+
+### Reference implementation: one kernel draw per ant and dimension ###
+def constructLoop(aco, p):
+    x = np.zeros((aco.colonySize, aco.xdim))
+    for l in range(aco.colonySize):
+        for i in range(aco.xdim):
+            j = np.random.choice(np.arange(aco.archiveSize), p=p)
+            Sji = aco.xbest[j,:][i]
+            sigma = aco.eps*np.sum(np.abs(aco.xbest[j,i]-aco.xbest[:,i]))
+            x[l,i] = Sji + sigma*np.random.normal()
+            if x[l,i]>aco.xub[i]:
+                x[l,i]=aco.xub[i]
+            elif x[l,i]<aco.xlb[i]:
+                x[l,i]=aco.xlb[i]
+    return x
+
+
+if __name__ == "__main__":
+
+    np.random.seed(42)
+
+    ### Sorted deviation sums equal the pairwise definition ###
+    X = np.random.rand(300, 5)
+    assert np.allclose(ACO.absoluteDeviationSums(X), np.sum(np.abs(X[:,None,:]-X[None,:,:]), axis=1))
+
+    ### Both schemes sample the same distribution ###
+    aco = ACO(None, [(0,1)]*3, [(0,1)]*2, colonySize=8, archiveSize=8)
+    aco.xbest = np.random.rand(8, 3)
+    p = np.random.rand(8)
+    p = p/np.sum(p)
+    loop = np.stack([constructLoop(aco, p) for _ in range(5000)])
+    vec = np.stack([aco.construct(p) for _ in range(5000)])
+    print("ant mean |loop-vec| max: {:.4f}  std |loop-vec| max: {:.4f}".format(np.abs(loop.mean(axis=0)-vec.mean(axis=0)).max(), np.abs(loop.std(axis=0)-vec.std(axis=0)).max()))
+
+    for colonySize, archiveSize, xdim in [(10, 10, 3), (100, 100, 10), (1000, 1000, 30), (10000, 10000, 100)]:
+        aco = ACO(None, [(0,1)]*xdim, [(0,1)]*2, colonySize=colonySize, archiveSize=archiveSize)
+        aco.xbest = np.random.rand(archiveSize, xdim)
+        p = np.random.rand(archiveSize)
+        p = p/np.sum(p)
+
+        ### The loop is too slow for the largest colony ###
+        tloop = timeit(lambda: constructLoop(aco, p), nrepeat=1) if colonySize*xdim <= 30000 else np.nan
+        tvec = timeit(lambda: aco.construct(p))
+
+        print("colony={:6d} archive={:6d} xdim={:4d} loop: {:10.2f} ms  array: {:8.2f} ms  speedup: {:7.1f}x".format(colonySize, archiveSize, xdim, 1e3*tloop, 1e3*tvec, tloop/tvec))
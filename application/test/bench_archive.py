@@ -0,0 +1,83 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+
+from optimizer.archive import EpsilonArchive
+from optimizer.archive import ParetoArchive
+from optimizer.pareto import Pareto
+
+
+### Reference implementation: string keyed bins and row deletion ###
+def epsDominanceLoop(xbest, ybest, nbins):
+    bins = np.linspace(0,1, nbins)
+    binDistance, index2delete = {}, []
+
+    for n in range(ybest.shape[0]):
+        Ydim = ybest[n,:]
+        inds = np.digitize(Ydim, bins)
+        inds_key = '-'.join(map(str,inds))
+        dist = sum([(Ydim[i]-bins[inds[i]-1])**2 for i in range(ybest.shape[1])])
+
+        if not inds_key in list(binDistance.keys()):
+            binDistance[inds_key] = [dist, n]
+        else:
+            if binDistance[inds_key][0] < dist:
+                index2delete.append(n)
+            else:
+                index2delete.append(binDistance[inds_key][1])
+                binDistance[inds_key][0] = dist
+                binDistance[inds_key][1] = n
+
+    return np.delete(xbest,index2delete,axis=0), np.delete(ybest,index2delete,axis=0)
+
+
+if __name__ == "__main__":
+
+    np.random.seed(42)
+
+    for ydim, nbins in [(2, 6), (2, 50), (3, 20)]:
+        for n in [1000, 10000, 100000]:
+            X, Y = np.random.rand(n, 3), np.random.rand(n, ydim)
+
+            archive = EpsilonArchive(3, np.zeros(ydim), np.ones(ydim), nbins=nbins)
+            t0 = time.perf_counter()
+            archive.add(X, Y)
+            tbatch = time.perf_counter()-t0
+
+            ### Same designs, one generation of 100 at a time ###
+            incremental = EpsilonArchive(3, np.zeros(ydim), np.ones(ydim), nbins=nbins)
+            t0 = time.perf_counter()
+            for i in range(0, n, 100):
+                incremental.add(X[i:i+100], Y[i:i+100])
+            tincr = time.perf_counter()-t0
+
+            if n <= 10000:
+                t0 = time.perf_counter()
+                xref, yref = epsDominanceLoop(X, Y, nbins)
+                tloop = time.perf_counter()-t0
+                assert np.array_equal(np.sort(yref, axis=0), np.sort(archive.y, axis=0))
+                assert np.array_equal(np.sort(yref, axis=0), np.sort(incremental.y, axis=0))
+            else:
+                tloop = np.nan
+
+            print("ydim={} bins={:3d} n={:6d} boxes: {:5d}  loop: {:9.2f} ms  batch: {:7.2f} ms  generations: {:7.2f} ms".format(ydim, nbins, n, len(archive), 1e3*tloop, 1e3*tbatch, 1e3*tincr))
+
+    ### Pareto archive upkeep per generation vs re-sorting the whole history ###
+    for ydim in [2, 3]:
+        archive = ParetoArchive(3, ydim, capacity=100)
+        history = np.zeros((0, ydim))
+        for generation in range(1, 1001):
+            Y = np.random.rand(100, ydim)
+            t0 = time.perf_counter()
+            archive.add(np.zeros((100, 3)), Y)
+            tadd = time.perf_counter()-t0
+
+            history = np.vstack((history, Y))
+            if generation in [10, 100, 1000]:
+                t0 = time.perf_counter()
+                Pareto.nonDominatedSort(history)
+                tsort = time.perf_counter()-t0
+                print("ydim={} generation {:5d} history: {:6d}  archive add: {:6.2f} ms  full sort: {:8.2f} ms".format(ydim, generation, history.shape[0], 1e3*tadd, 1e3*tsort))
@@ -0,0 +1,43 @@
+import sys
+import os
+import time
+import pickle
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.swarm import Swarm
+from optimizer.checkpoint import Checkpoint
+from bench_helpers import parabolas
+
+
+if __name__ == "__main__":
+
+    tmp = tempfile.mkdtemp()
+
+    for nparticles in [100, 10000, 1000000]:
+        swarm = Swarm(parabolas, [(-4,4)]*10, [(0,40), (0,40)], nparticles=nparticles, minimumSwarmSize=nparticles,
+                      checkpoint=os.path.join(tmp, "swarm.npz"), checkpointInterval=10**9)
+        swarm.iterate(1)
+        state = swarm.state()
+
+        ### Synchronous pickle of the state, as the old backups did ###
+        t0 = time.perf_counter()
+        with open(os.path.join(tmp, "swarm.pkl"), 'wb') as f:
+            pickle.dump(state, f)
+        tpickle = time.perf_counter()-t0
+
+        ### Time spent in the optimizer thread, then until the file is on disk ###
+        checkpoint = Checkpoint(os.path.join(tmp, "swarm.npz"))
+        t0 = time.perf_counter()
+        checkpoint.save(1, state)
+        tsave = time.perf_counter()-t0
+        checkpoint.flush()
+        tdisk = time.perf_counter()-t0
+
+        t0 = time.perf_counter()
+        checkpoint.load()
+        tload = time.perf_counter()-t0
+
+        print("nparticles={:8d} pickle: {:8.2f} ms  save (blocking): {:7.2f} ms  on disk: {:8.2f} ms  load: {:7.2f} ms".format(nparticles, 1e3*tpickle, 1e3*tsave, 1e3*tdisk, 1e3*tload))
@@ -0,0 +1,121 @@
+import numpy as np
+import sys
+import os
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from application import application, init_db
+from application.common.database import Database
+from application.common.database import BufferedWriter
+from application.config import DESIGNSCOLLECTION
+from application.models.simulation.digitaltwin import DigitalTwin
+from application.models.simulation.digitaltwin import DESIGNCOLUMNS
+from bench_helpers import design
+
+
+### Insert ndesigns rows from each of nthreads threads ###
+def insertThroughput(nthreads, ndesigns):
+    def worker(caseid):
+        for _ in range(ndesigns):
+            Database.insert(DESIGNSCOLLECTION, [design(caseid)])
+
+    threads = [threading.Thread(target=worker, args=(caseid,)) for caseid in range(nthreads)]
+    t0 = time.perf_counter()
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    return nthreads*ndesigns/(time.perf_counter()-t0)
+
+
+### Write ndesigns rows in generations of ngen through a BufferedWriter ###
+def bufferedThroughput(ndesigns, ngen=100, maxRows=1000):
+    writer = BufferedWriter(DESIGNSCOLLECTION, DESIGNCOLUMNS, maxRows=maxRows)
+    t0 = time.perf_counter()
+    for _ in range(ndesigns//ngen):
+        writer.add([design(0) for _ in range(ngen)])
+    writer.close()
+    return ndesigns/(time.perf_counter()-t0)
+
+
+### /opti_data latency while nwriters threads keep inserting ###
+def optiDataLatency(nwriters, npolls=50, caseid=0):
+    stop = threading.Event()
+
+    def writer(caseid):
+        while not stop.is_set():
+            Database.insert(DESIGNSCOLLECTION, [design(caseid)])
+
+    threads = [threading.Thread(target=writer, args=(c+1,)) for c in range(nwriters)]
+    [t.start() for t in threads]
+
+    client, latencies = application.test_client(), []
+    for _ in range(npolls):
+        t0 = time.perf_counter()
+        client.post("/simulation/opti_data/{}".format(caseid))
+        latencies.append(time.perf_counter()-t0)
+
+    stop.set()
+    [t.join() for t in threads]
+    return 1e3*np.median(latencies), 1e3*np.percentile(latencies, 95)
+
+
+### Add designs for cases [first, last) and time get_opti_data of case 0 ###
+def caseQueryLatency(first, last, ndesigns=200, npolls=20):
+    writer = BufferedWriter(DESIGNSCOLLECTION, DESIGNCOLUMNS, maxRows=10000)
+    for caseid in range(first, last):
+        writer.add([design(caseid) for _ in range(ndesigns)])
+    writer.close()
+
+    latencies = []
+    for _ in range(npolls):
+        t0 = time.perf_counter()
+        DigitalTwin.get_opti_data(0)
+        latencies.append(time.perf_counter()-t0)
+    return 1e3*np.median(latencies)
+
+
+if __name__ == "__main__":
+
+    ### Per-case query latency without and with the caseid index ###
+    for indexed in [False, True]:
+        with tempfile.TemporaryDirectory() as tmp:
+            Database.close()
+            Database.PATH2DB = os.path.join(tmp, "bench.db")
+            init_db()
+            if not indexed:
+                Database.connect().execute("DROP INDEX IF EXISTS idx_{}_caseid_id".format(DESIGNSCOLLECTION))
+
+            ncases = 0
+            for total in [10, 100, 1000]:
+                p50 = caseQueryLatency(ncases, total)
+                ncases = total
+                print("indexed={!s:5} {:7d} designs: get_opti_data p50 {:7.2f} ms".format(indexed, 200*ncases, p50))
+            Database.close()
+
+    configs = [("connect per call", dict(POOL=False)),
+               ("pool, WAL, synchronous=NORMAL", dict(POOL=True, JOURNALMODE="WAL", SYNCHRONOUS="NORMAL")),
+               ("pool, WAL, synchronous=FULL", dict(POOL=True, JOURNALMODE="WAL", SYNCHRONOUS="FULL")),
+               ]
+
+    for name, config in configs:
+        with tempfile.TemporaryDirectory() as tmp:
+            Database.close()
+            Database.PATH2DB = os.path.join(tmp, "bench.db")
+            for key, val in config.items():
+                setattr(Database, key, val)
+            init_db()
+
+            print(name)
+            for nthreads in [1, 4, 8]:
+                print("  insert  {} threads: {:8.0f} designs/s".format(nthreads, insertThroughput(nthreads, 500)))
+
+            print("  buffered writer, 10k designs: {:8.0f} designs/s".format(bufferedThroughput(10000)))
+
+            for nwriters in [0, 4]:
+                p50, p95 = optiDataLatency(nwriters)
+                print("  /opti_data with {} writers: p50 {:6.2f} ms  p95 {:6.2f} ms".format(nwriters, p50, p95))
+
+            Database.close()
@@ -0,0 +1,52 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.joukowski import JoukowskiAirfoil
+from optimizer.evaluator import Evaluator
+from bench_helpers import rosenbrockFitness
+
+
+### Full flow-field solve per design at two operating points ###
+def joukowskiFitness(X, nx=100, ny=100):
+    y = np.zeros((X.shape[0], 2))
+    for n in range(X.shape[0]):
+        for m, (Uinf, alpha) in enumerate([(10.0, 2.0), (20.0, 8.0)]):
+            sim = JoukowskiAirfoil(Uinf=Uinf, R=X[n,0], beta=X[n,1], a=X[n,2], alpha=alpha)
+            sim.calculateFlowField(nx=nx, ny=ny)
+            y[n,m] = sim.lift
+    return y, np.zeros((X.shape[0], 0))
+
+
+### Time one evaluation of X ###
+def timeEvaluator(evaluator, fct, X):
+    evaluator(fct, X[:2], {})
+    t0 = time.perf_counter()
+    Y, C = evaluator(fct, X, {})
+    return time.perf_counter()-t0, Y
+
+
+if __name__ == "__main__":
+
+    np.random.seed(42)
+    nworkers = [1, 2, 4, os.cpu_count()]
+
+    Xrosen = -2+4*np.random.rand(100000, 2)
+    Xjouk = np.column_stack((1.05+0.2*np.random.rand(256), 20*np.random.rand(256), 0.9+0.1*np.random.rand(256)))
+
+    for name, fct, X in [("rosenbrock", rosenbrockFitness, Xrosen), ("joukowski", joukowskiFitness, Xjouk)]:
+        tserial, Yserial = timeEvaluator(Evaluator.create("serial"), fct, X)
+        print("{:10s} serial              : {:8.2f} ms".format(name, 1e3*tserial))
+
+        for backend in ["thread", "process"]:
+            for n in sorted(set(nworkers)):
+                evaluator = Evaluator.create(backend, nworkers=n)
+                t, Y = timeEvaluator(evaluator, fct, X)
+                evaluator.close()
+
+                assert np.array_equal(np.asarray(Yserial).reshape(Y.shape), Y), "Row order not preserved"
+                print("{:10s} {:7s} x {:2d} workers: {:8.2f} ms  speedup: {:5.2f}x".format(name, backend, n, 1e3*t, tserial/t))
@@ -0,0 +1,48 @@
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.genetic import GA
+from bench_helpers import timeit
+
+
+### Reference implementation: trial vectors built member by member ###
+def evolveLoop(xNorm, npop, mut=0.5, crossp=0.7):
+    xdim = xNorm.shape[1]
+    x = np.zeros((npop, xdim))
+    for j in range(npop):
+        idxs = [i for i in range(xNorm.shape[0]) if i != j]
+        a, b, c = xNorm[np.random.choice(idxs, 3, replace = False)]
+        mutant = np.clip(a + mut * (b - c), 0, 1)
+        cross_points = np.random.rand(xdim) < crossp
+        if not np.any(cross_points):
+            cross_points[np.random.randint(0, xdim)] = True
+        x[j,:] = np.where(cross_points, mutant, xNorm[j,:])
+    return x
+
+
+if __name__ == "__main__":
+
+    np.random.seed(42)
+
+    ### Both schemes sample the same trial distribution ###
+    ga = GA(None, [(0,1)]*3, [(0,1)]*2, npop=8)
+    xNorm, ranks = np.random.rand(16, 3), np.sort(np.random.randint(0, 3, 16))
+    loop = np.stack([evolveLoop(xNorm, 8) for _ in range(5000)])
+    vec = np.stack([ga.evolve(xNorm, ranks) for _ in range(5000)])
+    print("trial mean |loop-vec| max: {:.4f}  std |loop-vec| max: {:.4f}".format(np.abs(loop.mean(axis=0)-vec.mean(axis=0)).max(), np.abs(loop.std(axis=0)-vec.std(axis=0)).max()))
+
+    for npop in [20, 200, 2000, 20000]:
+        ga = GA(None, [(0,1)]*10, [(0,1)]*2, npop=npop)
+        xNorm, ranks = np.random.rand(2*npop, 10), np.sort(np.random.randint(0, 10, 2*npop))
+
+        ### The loop is quadratic in npop, skip it for the largest population ###
+        tloop = timeit(lambda: evolveLoop(xNorm, npop), nrepeat=1) if npop <= 2000 else np.nan
+        print("npop={:6d} loop: {:9.2f} ms".format(npop, 1e3*tloop), end="")
+        for strategy in GA.STRATEGIES:
+            tvec = timeit(lambda: ga.evolve(xNorm, ranks, strategy=strategy))
+            print("  {}: {:7.2f} ms ({:6.1f}x)".format(strategy, 1e3*tvec, tloop/tvec), end="")
+        print("")
@@ -0,0 +1,59 @@
+import numpy as np
+import time
+
+from test_functions import rosenbrock, binhAndKorn
+
+
+##########################################################################
+### Helpers shared by the bench_*.py scripts
+### Fitness functions stay at module level so that process pools can pickle them
+##########################################################################
+
+### Rosenbrock as (targets, constraints) ###
+def rosenbrockFitness(X):
+    rspns = rosenbrock(X)
+    return rspns[:,:1], rspns[:,1:]
+
+
+### Binh and Korn as (targets, constraints) ###
+def binhAndKornFitness(X):
+    rspns = binhAndKorn(X)
+    return rspns[:,:2], rspns[:,2:]
+
+
+### Two objective test problem, cheap enough to time the optimizer itself ###
+def parabolas(X):
+    X = np.atleast_2d(X)
+    return [np.column_stack((X[:,0]**2+X[:,1]**2, (X[:,0]-2)**2+X[:,1]**2)), np.zeros((X.shape[0], 0))]
+
+
+### One design row as written by the optimizer ###
+def design(caseid, rng=np.random):
+    row = {"id": None, "caseid": int(caseid), "R": 1.1, "a": 1.0, "beta": 5.0}
+    row.update({key: float(v) for key, v in zip(["clop1", "cdop1", "lop1", "dop1", "clop2", "cdop2", "lop2", "dop2"], rng.random(8))})
+    return row
+
+
+### Seconds per call: calls are batched so that one sample lasts at least minSample ###
+def measure(fct, repeat=7, minSample=0.02, maxNumber=10000):
+    number = 1
+    if minSample > 0:
+        t0 = time.perf_counter()
+        fct()
+        once = time.perf_counter()-t0
+        number = int(min(max(1, np.ceil(minSample/max(once, 1e-9))), maxNumber))
+
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fct()
+        samples.append((time.perf_counter()-t0)/number)
+    samples = np.asarray(samples)
+    return {"min": samples.min(), "median": float(np.median(samples)), "mean": samples.mean(), "std": samples.std(),
+            "number": number, "repeat": repeat}
+
+
+### Time a callable, best of nrepeat single calls ###
+def timeit(fct, nrepeat=3):
+    return measure(fct, repeat=nrepeat, minSample=0)["min"]
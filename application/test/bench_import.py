@@ -0,0 +1,34 @@
+import numpy as np
+import sys
+import os
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../')
+MODELS = os.path.join(ROOT, 'application/models')
+
+### Cold start statements, each run in a fresh interpreter ###
+STARTUPS = {"python + numpy": (ROOT, "import numpy"),
+            "web app": (ROOT, "from application import application"),
+            "headless solver": (MODELS, "from simulation.joukowski import JoukowskiAirfoil; from optimizer.swarm import Swarm; from optimizer.pareto import Pareto"),
+            "plotting stack": (ROOT, "import matplotlib; matplotlib.use('Agg'); import matplotlib.pyplot; import bokeh.plotting"),
+            }
+
+PLOTTING = ["matplotlib", "bokeh", "pyspark"]
+
+
+### Wall time of one fresh interpreter running stmt, and plotting modules it loaded ###
+def coldStart(cwd, stmt):
+    code = "import time; t0 = time.perf_counter(); {}; t1 = time.perf_counter(); import sys; print(t1-t0); print(','.join(m for m in {} if m in sys.modules))".format(stmt, PLOTTING)
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True, capture_output=True, text=True).stdout.split("\n")
+    return float(out[0]), out[1]
+
+
+if __name__ == "__main__":
+
+    for name, (cwd, stmt) in STARTUPS.items():
+        times, loaded = [], ""
+        for _ in range(5):
+            t, loaded = coldStart(cwd, stmt)
+            times.append(t)
+
+        print("{:16s} import: p50 {:8.1f} ms  min {:8.1f} ms  plotting modules: {}".format(name, 1e3*np.median(times), 1e3*np.min(times), loaded or "-"))
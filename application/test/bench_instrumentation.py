@@ -0,0 +1,44 @@
+import sys
+import os
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.swarm import Swarm
+from optimizer.genetic import GA
+from optimizer.antcolony import ACO
+from optimizer.instrumentation import Instrumentation
+from bench_helpers import binhAndKornFitness
+
+
+OPTIMIZERS = [(Swarm, dict(nparticles=200)), (GA, dict(npop=200)), (ACO, dict(colonySize=200, archiveSize=200))]
+
+
+if __name__ == "__main__":
+
+    ### Cost of one timed phase ###
+    instrumentation = Instrumentation()
+    t0 = time.perf_counter()
+    for _ in range(100000):
+        with instrumentation.timer("phase"):
+            pass
+    print("timer overhead: {:.2f} us per phase".format(1e6*(time.perf_counter()-t0)/100000))
+
+    ### Where the iteration time goes ###
+    for cls, options in OPTIMIZERS:
+        events = []
+        optimizer = cls(binhAndKornFitness, [(0,5), (0,3)], [(0,140), (0,50)], [(0,25), (7.7,100)], seed=42,
+                        eventCallback=lambda event, payload: events.append(event), **options)
+        t0 = time.perf_counter()
+        optimizer.iterate(20)
+        optimizer.close()
+        twall = time.perf_counter()-t0
+
+        snapshot = optimizer.instrumentation.snapshot()
+        timed = sum(timer["total"] for timer in snapshot["timers"].values())
+        print("{:5s} wall: {:7.2f} ms  timed: {:7.2f} ms  events: {}".format(cls.__name__, 1e3*twall, timed, len(events)))
+        for name, timer in sorted(snapshot["timers"].items(), key=lambda item: -item[1]["total"]):
+            print("      {:10s} {:4d} calls {:8.2f} ms total {:7.3f} ms max".format(name, timer["calls"], timer["total"], timer["max"]))
+        print("      counters: {}".format(json.dumps(snapshot["counters"])))
@@ -0,0 +1,83 @@
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.joukowski import JoukowskiAirfoil
+from simulation.joukowski import JoukowskiBatch
+from simulation.joukowski import JoukowskiGeometry
+from bench_helpers import timeit
+
+
+### Reference implementation: node-by-node evaluation of F and V ###
+def calculateFlowFieldLoop(sim, nx=100, ny=100, rfac=6):
+    r, phi = np.meshgrid(np.linspace(sim.R,rfac*sim.R, ny), np.linspace(-np.pi, np.pi, nx))
+    z1 = r*np.cos(phi)+1j*r*np.sin(phi)
+    z2 = sim.trafo_z1_to_z2(z1)
+
+    F = np.zeros(z1.shape, dtype=np.complex128)
+    V = np.zeros(z1.shape, dtype=np.complex128)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for m in range(z1.shape[0]):
+            for n in range(z1.shape[1]):
+                F[m,n] = sim.Uinf*np.exp(-1j*sim.alpha) * (z1[m,n] + sim.R**2*np.exp(2j*sim.alpha)/z1[m,n]) - 1j*sim.gamma/(2*np.pi)*np.log(z2[m,n]/sim.R)
+                V[m,n] = (sim.Uinf*(1-(sim.R/z2[m,n])**2)-1j*sim.gamma/(2*np.pi*z2[m,n]))*np.exp(-1j*sim.alpha)/(1-(sim.a/sim.trafo_z1_to_z(z1[m,n]))**2)
+    return F, V
+
+
+if __name__ == "__main__":
+
+    for n in [25, 50, 100, 200]:
+        sim = JoukowskiAirfoil(Uinf=20, R=1.25, alpha=14.0, beta=20.0, rho=1.0)
+
+        tvec = timeit(lambda: sim.calculateFlowField(nx=n, ny=n))
+        tloop = timeit(lambda: calculateFlowFieldLoop(sim, nx=n, ny=n), nrepeat=1)
+
+        F, V = calculateFlowFieldLoop(sim, nx=n, ny=n)
+        finite = np.isfinite(V)
+        assert np.allclose(F, sim.F) and np.array_equal(finite, np.isfinite(sim.V)) and np.allclose(V[finite], sim.V[finite])
+
+        print("Grid {:4d}x{:<4d} loop: {:9.2f} ms  array: {:7.2f} ms  speedup: {:7.1f}x".format(n, n, 1e3*tloop, 1e3*tvec, tloop/tvec))
+
+    ### Surface-only evaluation vs full field ###
+    for n in [100, 200, 400]:
+        sim = JoukowskiAirfoil(Uinf=20, R=1.25, alpha=14.0, beta=20.0, rho=1.0)
+
+        tfield = timeit(lambda: sim.calculateFlowField(nx=n, ny=100))
+        lift, drag = sim.lift, sim.drag
+        tsurf = timeit(lambda: sim.calculateCoefficients(nx=n))
+        assert np.isclose(lift, sim.lift) and np.isclose(drag, sim.drag)
+
+        print("Surface nx={:4d} field: {:7.2f} ms  surface: {:7.3f} ms  speedup: {:7.1f}x".format(n, 1e3*tfield, 1e3*tsurf, tfield/tsurf))
+
+    ### Batched designs x operating points vs one solve per design ###
+    for n in [10, 100, 1000]:
+        R, a, beta = 1.05+0.2*np.random.rand(n), 0.9+0.1*np.random.rand(n), 20*np.random.rand(n)
+        Uinf, alpha = [10.0, 20.0], [2.0, 8.0]
+
+        def single():
+            for i in range(n):
+                for j in range(len(Uinf)):
+                    JoukowskiAirfoil(Uinf=Uinf[j], R=R[i], a=a[i], alpha=alpha[j], beta=beta[i]).calculateCoefficients()
+
+        batch = JoukowskiBatch(Uinf=Uinf, R=R, a=a, alpha=alpha, beta=beta)
+        tsingle = timeit(single, nrepeat=1)
+        tbatch = timeit(lambda: batch.calculateCoefficients())
+
+        print("Batch {:5d} designs x {} ops single: {:9.2f} ms  batch: {:7.2f} ms  speedup: {:7.1f}x".format(n, len(Uinf), 1e3*tsingle, 1e3*tbatch, tsingle/tbatch))
+
+
+    ### Two operating points of one design, geometry built per solve vs shared ###
+    for n in [100, 200, 400]:
+        ops = [JoukowskiAirfoil(Uinf=10, R=1.25, alpha=2.0, beta=20.0), JoukowskiAirfoil(Uinf=20, R=1.25, alpha=8.0, beta=20.0)]
+
+        def cold():
+            JoukowskiGeometry._cache.clear()
+            [sim.calculateFlowField(nx=n, ny=n) for sim in ops]
+
+        tcold = timeit(cold)
+        twarm = timeit(lambda: [sim.calculateFlowField(nx=n, ny=n) for sim in ops])
+
+        print("Geometry {:4d}x{:<4d} 2 ops cold: {:7.2f} ms  shared: {:7.2f} ms  speedup: {:7.1f}x".format(n, n, 1e3*tcold, 1e3*twarm, tcold/twarm))
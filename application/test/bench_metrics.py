@@ -0,0 +1,56 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.swarm import Swarm
+from optimizer.genetic import GA
+from optimizer.antcolony import ACO
+from optimizer.metrics import Metrics
+from test_functions import binhAndKorn
+from bench_helpers import binhAndKornFitness
+
+
+### Analytic Binh and Korn front: x = y on [0, 3], then y = 3 up to x = 5 ###
+def binhAndKornFront(npts=200):
+    t = np.linspace(0, 5, npts)
+    X = np.column_stack((t, np.minimum(t, 3)))
+    return binhAndKorn(X)[:,:2]
+
+
+OPTIMIZERS = [(Swarm, dict(nparticles=50)), (GA, dict(npop=50)), (ACO, dict(colonySize=50, archiveSize=50))]
+
+
+if __name__ == "__main__":
+
+    rng = np.random.default_rng(42)
+
+    ### Cost of one indicator evaluation per archive size ###
+    for ydim in [2, 3, 4]:
+        for n in [100, 1000]:
+            F = rng.random((n, ydim))
+            F = F/np.linalg.norm(F, axis=1, keepdims=True)
+            t0 = time.perf_counter()
+            hv = Metrics.hypervolume(F, 1.1*np.ones(ydim))
+            thv = time.perf_counter()-t0
+            t0 = time.perf_counter()
+            Metrics.spread(F)
+            tspread = time.perf_counter()-t0
+            print("ydim={} n={:5d} hypervolume: {:6.4f} in {:8.2f} ms  spread: {:7.2f} ms".format(ydim, n, hv, 1e3*thv, 1e3*tspread))
+
+    ### Fixed budget vs stagnation stopping ###
+    results = []
+    for cls, options in OPTIMIZERS:
+        for window in [None, 5]:
+            optimizer = cls(binhAndKornFitness, [(0,5), (0,3)], [(0,140), (0,50)], [(0,25), (7.7,100)], seed=42,
+                            referenceFront=binhAndKornFront(), stagnationWindow=window, stagnationTolerance=1e-3, **options)
+            optimizer.iterate(100)
+            optimizer.close()
+            results.append((cls.__name__, window, optimizer.history[-1]))
+
+    for name, window, (iteration, evaluations, hv, igd, spread) in results:
+        print("{:5s} stagnationWindow={:4s} iterations: {:3.0f}  evaluations: {:5.0f}  hypervolume: {:6.4f}  igd: {:6.4f}  spread: {:5.3f}".format(
+              name, str(window), iteration, evaluations, hv, igd, spread))
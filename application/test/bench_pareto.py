@@ -0,0 +1,64 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+
+from optimizer.pareto import Pareto
+
+
+### Reference implementation: cull based front peeling ###
+def cull(pts):
+    dominated, cleared = [], []
+    remaining = pts
+
+    while remaining:
+        candidate = remaining[0]
+        new_remaining = []
+        for other in remaining[1:]:
+            [new_remaining, dominated][Pareto.dominates(candidate, other)].append(other)
+        if not any(Pareto.dominates(other, candidate) for other in new_remaining):
+            cleared.append(candidate)
+        else:
+            dominated.append(candidate)
+        remaining = new_remaining
+    return cleared, dominated
+
+
+def computeParetoRanksCull(Y):
+    indexunranked = np.arange(0,Y.shape[0])
+    ranks = 99*np.ones(Y.shape[0])
+    paretoRank = 0
+    while len(indexunranked) > 0:
+        Ypareto, _ = cull(Y[indexunranked,:].tolist())
+        paretoIndex = [indexunranked[np.all(Y[indexunranked,:] == ypareto, axis=1)][0] for ypareto in Ypareto]
+        ranks[paretoIndex] = paretoRank
+        indexunranked = np.asarray([i for i in indexunranked if not i in paretoIndex])
+        paretoRank += 1
+    return ranks
+
+
+if __name__ == "__main__":
+
+    np.random.seed(42)
+
+    for ydim in [2, 3, 4]:
+        for n in [1000, 10000, 100000]:
+            ### Fronts of 4+ objectives hold most of the archive, the ENS fallback is quadratic there ###
+            if ydim > 3 and n > 10000:
+                continue
+            Y = np.random.rand(n, ydim)
+
+            t0 = time.perf_counter()
+            ranks, fronts = Pareto.nonDominatedSort(Y)
+            tnew = time.perf_counter()-t0
+
+            if n <= 1000:
+                t0 = time.perf_counter()
+                ranksCull = computeParetoRanksCull(Y)
+                tcull = time.perf_counter()-t0
+                assert np.array_equal(ranks, ranksCull)
+                print("ydim={} n={:6d} cull: {:9.2f} ms  nds: {:8.2f} ms  fronts: {:4d}  speedup: {:7.1f}x".format(ydim, n, 1e3*tcull, 1e3*tnew, len(fronts), tcull/tnew))
+            else:
+                print("ydim={} n={:6d} nds: {:8.2f} ms  fronts: {:4d}".format(ydim, n, 1e3*tnew, len(fronts)))
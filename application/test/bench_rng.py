@@ -0,0 +1,51 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.swarm import Swarm
+from optimizer.genetic import GA
+from optimizer.antcolony import ACO
+from bench_helpers import binhAndKornFitness
+
+
+OPTIMIZERS = [(Swarm, dict(nparticles=50)), (GA, dict(npop=50)), (ACO, dict(colonySize=50, archiveSize=50))]
+
+
+### Pareto archive after itermax iterations of a seeded run ###
+def run(cls, options, evaluator, seed=42, itermax=10):
+    optimizer = cls(binhAndKornFitness, [(0,5), (0,3)], [(0,140), (0,50)], [(0,25), (7.7,100)],
+                    evaluator=evaluator, nworkers=4, seed=seed, **options)
+    optimizer.iterate(itermax)
+    optimizer.close()
+    return optimizer.paretoArchive.x.copy()
+
+
+### Time ndraws uniform numbers, one call per draw or one batched call ###
+def drawTimes(ndraws):
+    t0 = time.perf_counter()
+    [np.random.rand() for _ in range(ndraws)]
+    tscalar = time.perf_counter()-t0
+
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    rng.random(ndraws)
+    return tscalar, time.perf_counter()-t0
+
+
+if __name__ == "__main__":
+
+    ### Seeded runs are bit-identical across evaluation backends ###
+    for cls, options in OPTIMIZERS:
+        reference = run(cls, options, "serial")
+        for evaluator in ["thread", "process"]:
+            assert np.array_equal(reference, run(cls, options, evaluator)), "{} differs with {}".format(cls.__name__, evaluator)
+        different = not np.array_equal(reference, run(cls, options, "serial", seed=43))
+        print("{:5s} seed=42 identical for serial/thread/process, seed=43 differs: {}".format(cls.__name__, different))
+
+    for ndraws in [1000, 100000, 1000000]:
+        tscalar, tbatch = drawTimes(ndraws)
+        print("ndraws={:8d} scalar np.random.rand: {:8.2f} ms  batched Generator: {:6.2f} ms".format(ndraws, 1e3*tscalar, 1e3*tbatch))
@@ -0,0 +1,49 @@
+import numpy as np
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../'))
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../'))
+
+from application import application, init_db
+from application.common.database import Database
+from application.models.simulation.digitaltwin import DigitalTwin
+from application.models.simulation.views import renders
+
+
+### p50 and p95 of fct in ms ###
+def latency(fct, nrepeat=20):
+    latencies = []
+    for _ in range(nrepeat):
+        t0 = time.perf_counter()
+        fct()
+        latencies.append(time.perf_counter()-t0)
+    return 1e3*np.median(latencies), 1e3*np.percentile(latencies, 95)
+
+
+if __name__ == "__main__":
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Database.PATH2DB = os.path.join(tmp, "bench.db")
+        init_db()
+
+        dt = DigitalTwin(U1=10, U2=20, alpha1=2, alpha2=8, R0=1.1, a0=1.0, beta0=10.0)
+        caseid = dt.store()
+
+        try:
+            p50, p95 = latency(lambda: dt.simulate(plot=True, render=True))
+            print("simulate, plots rendered in the request: p50 {:7.2f} ms  p95 {:7.2f} ms".format(p50, p95))
+
+            client = application.test_client()
+            p50, p95 = latency(lambda: client.get("/simulation/simulate/{}".format(caseid)))
+            print("/simulate, plots rendered in the background: p50 {:7.2f} ms  p95 {:7.2f} ms".format(p50, p95))
+
+            ### Wait for the last render before the directory is removed ###
+            while not all(job.done for job in renders.find(caseid=caseid)):
+                time.sleep(0.05)
+        finally:
+            shutil.rmtree("./application/static/res/{}".format(dt.directory), ignore_errors=True)
+            Database.close()
@@ -0,0 +1,221 @@
+import numpy as np
+import sys
+import os
+import json
+import shutil
+import argparse
+import datetime
+import platform
+import itertools
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.joukowski import JoukowskiAirfoil
+from simulation.joukowski import JoukowskiGeometry
+from optimizer.pareto import Pareto
+from optimizer.swarm import Swarm
+from optimizer.genetic import GA
+from optimizer.antcolony import ACO
+from bench_helpers import rosenbrockFitness, binhAndKornFitness, design, measure
+
+
+### Problems as (fitness, xbounds, ybounds, cbounds) ###
+PROBLEMS = {"rosenbrock": (rosenbrockFitness, [(-2,2), (-2,2)], [(0,10)], [(0,4)]),
+            "binhAndKorn": (binhAndKornFitness, [(0,5), (0,3)], [(0,140), (0,50)], [(0,25), (7.7,100)])}
+
+OPTIMIZERS = {"Swarm": (Swarm, dict(nparticles=100, minimumSwarmSize=100)),
+              "GA": (GA, dict(npop=100)),
+              "ACO": (ACO, dict(colonySize=100, archiveSize=100))}
+
+
+##########################################################################
+### Suites in asv style: setup(*params), time_* methods, teardown(*params)
+### Every combination of params is one benchmark
+##########################################################################
+
+class JoukowskiSuite(object):
+    params = [[50, 100, 200, 400]]
+    paramNames = ["grid"]
+
+    def setup(self, grid):
+        self.sim = JoukowskiAirfoil(Uinf=10.0, R=1.15, beta=5.0, a=1.0, alpha=4.0)
+
+    ### The geometry of a repeated shape comes from the cache ###
+    def time_calculateFlowField(self, grid):
+        self.sim.calculateFlowField(nx=grid, ny=grid)
+
+    def time_calculateFlowFieldCold(self, grid):
+        JoukowskiGeometry._cache.clear()
+        self.sim.calculateFlowField(nx=grid, ny=grid)
+
+
+class ParetoSuite(object):
+    params = [[100, 1000, 10000, 100000], [2, 3]]
+    paramNames = ["npoints", "ydim"]
+
+    def setup(self, npoints, ydim):
+        self.Y = np.random.default_rng(42).random((npoints, ydim))
+
+    def time_computeParetoRanks(self, npoints, ydim):
+        Pareto.computeParetoRanks(self.Y)
+
+
+class OptimizerSuite(object):
+    params = [list(OPTIMIZERS.keys()), list(PROBLEMS.keys())]
+    paramNames = ["optimizer", "problem"]
+
+    ### A warmed up run without checkpoints ###
+    def setup(self, optimizer, problem):
+        cls, options = OPTIMIZERS[optimizer]
+        fct, xbounds, ybounds, cbounds = PROBLEMS[problem]
+        self.optimizer = cls(fct, xbounds, ybounds, cbounds, seed=42, **options)
+        self.optimizer.iterate(2)
+
+    def time_generation(self, optimizer, problem):
+        self.optimizer.iterate(1)
+
+    def teardown(self, optimizer, problem):
+        self.optimizer.close()
+
+
+### Scratch database with ndesigns rows spread over 100 cases ###
+class ScratchDatabase(object):
+    params = [[10000, 100000]]
+    paramNames = ["ndesigns"]
+
+    def setup(self, ndesigns):
+        from application import init_db
+        from application.common.database import Database
+        from application.config import DESIGNSCOLLECTION
+        from application.models.simulation.digitaltwin import DESIGNCOLUMNS
+
+        self.tmp = tempfile.mkdtemp()
+        self.path2db = Database.PATH2DB
+        Database.close()
+        Database.PATH2DB = os.path.join(self.tmp, "bench.db")
+        init_db()
+
+        self.rng = np.random.default_rng(42)
+        rows = [design(n % 100, self.rng) for n in range(ndesigns)]
+        Database.insertMany(DESIGNSCOLLECTION, [tuple(row[key] for key in DESIGNCOLUMNS) for row in rows], columnNames=DESIGNCOLUMNS)
+
+        self.database, self.table, self.columns = Database, DESIGNSCOLLECTION, DESIGNCOLUMNS
+        self.rows = [tuple(design(0, self.rng)[key] for key in DESIGNCOLUMNS) for _ in range(1000)]
+
+    def teardown(self, ndesigns):
+        self.database.close()
+        self.database.PATH2DB = self.path2db
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class DatabaseSuite(ScratchDatabase):
+
+    def time_insert(self, ndesigns):
+        self.database.insert(self.table, [design(0, self.rng)])
+
+    def time_insertMany(self, ndesigns):
+        self.database.insertMany(self.table, self.rows, columnNames=self.columns)
+
+    def time_find(self, ndesigns):
+        self.database.find(self.table, variables=["id", "lop1", "lop2", "dop1", "dop2"], query={"caseid": ["=", 1]}, orderBy="id")
+
+
+class FlaskSuite(ScratchDatabase):
+
+    def setup(self, ndesigns):
+        super().setup(ndesigns)
+        from application import application
+        self.client = application.test_client()
+        self.last = self.database.find(self.table, variables=["id"], query={"caseid": ["=", 1]}, orderBy="id")[-1]["id"]
+
+    ### Full history of a case, as on page load ###
+    def time_optiData(self, ndesigns):
+        self.client.post("/simulation/opti_data/1")
+
+    ### Incremental poll, nothing new since the last id ###
+    def time_optiDataSince(self, ndesigns):
+        self.client.post("/simulation/opti_data/1?since={}".format(self.last))
+
+
+SUITES = [JoukowskiSuite, ParetoSuite, OptimizerSuite, DatabaseSuite, FlaskSuite]
+
+
+##########################################################################
+### Runner
+##########################################################################
+
+### Run all benchmarks whose name contains pattern ###
+def run(suites=SUITES, pattern="", repeat=7):
+    results = {}
+    for suite in suites:
+        methods = sorted(name for name in dir(suite) if name.startswith("time_") and callable(getattr(suite, name)))
+        for params in itertools.product(*suite.params):
+            names = ["{}.{}({})".format(suite.__name__, method, ", ".join("{}={}".format(k, v) for k, v in zip(suite.paramNames, params)))
+                     for method in methods]
+            if not any(pattern in name for name in names):
+                continue
+
+            instance = suite()
+            instance.setup(*params)
+            try:
+                for method, name in zip(methods, names):
+                    if pattern in name:
+                        results[name] = measure(lambda: getattr(instance, method)(*params), repeat=repeat)
+                        print("{:70s} {:12.4f} ms".format(name, 1e3*results[name]["median"]))
+            finally:
+                if hasattr(instance, "teardown"):
+                    instance.teardown(*params)
+    return results
+
+
+### Commit and environment of a result file ###
+def environment():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "date": datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(), "numpy": np.__version__, "machine": platform.platform(), "cpus": os.cpu_count()}
+
+
+### Ratios new/old of the fastest samples (least affected by noise), benchmarks slower than threshold are regressions ###
+def compare(old, new, threshold=1.2, statistic="min"):
+    regressions = []
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        told, tnew = old["results"][name][statistic], new["results"][name][statistic]
+        ratio = tnew/told
+        flag = "slower" if ratio > threshold else "faster" if ratio < 1/threshold else ""
+        print("{:70s} {:12.4f} ms {:12.4f} ms {:6.2f}x {}".format(name, 1e3*told, 1e3*tnew, ratio, flag))
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmarks of the solver, Pareto ranking, optimizers and DB paths")
+    parser.add_argument("--bench", default="", help="only benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", default=None, help="result file, default benchmark_<commit>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    parser.add_argument("--statistic", default="min", choices=["min", "median", "mean"])
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f1, open(args.compare[1]) as f2:
+            regressions = compare(json.load(f1), json.load(f2), threshold=args.threshold, statistic=args.statistic)
+        sys.exit(1 if regressions else 0)
+
+    results = environment()
+    results["results"] = run(pattern=args.bench, repeat=args.repeat)
+
+    output = args.output or "benchmark_{}.json".format((results["commit"] or "local")[:8])
+    with open(output, "w") as f:
+        json.dump(results, f, indent=1, default=float)
+    print("Results written to {}".format(output))
@@ -0,0 +1,74 @@
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.swarm import Swarm
+from optimizer.genetic import GA
+from optimizer.antcolony import ACO
+from simulation.joukowski import JoukowskiBatch
+from bench_helpers import rosenbrockFitness, binhAndKornFitness
+
+
+### Lift at two operating points from the surface solution ###
+def joukowskiFitness(X):
+    sim = JoukowskiBatch(Uinf=[10.0, 20.0], R=X[:,0], beta=X[:,1], a=X[:,2], alpha=[2.0, 8.0])
+    sim.calculateCoefficients()
+    return np.column_stack((-sim.lift[:,0], sim.lift[:,1])), np.zeros((X.shape[0], 0))
+
+
+PROBLEMS = [
+    ("rosenbrock", rosenbrockFitness, [(-2,2), (-2,2)], [(0,10)], [(0,4)]),
+    ("binhAndKorn", binhAndKornFitness, [(0,5), (0,3)], [(0,140), (0,50)], [(0,25), (7.7,100)]),
+    ("joukowski", joukowskiFitness, [(1.05,1.25), (0,20), (0.9,1.0)], [(-3,0), (0,4)], []),
+]
+
+OPTIMIZERS = [(Swarm, dict(nparticles=40)), (GA, dict(npop=40)), (ACO, dict(colonySize=40, archiveSize=40))]
+
+
+### Dominated area (or best value) of the normalized Pareto archive, reference point 1 ###
+def quality(F):
+    F = F[np.all(F < 1, axis=1)]
+    if F.shape[0] == 0:
+        return 0.0
+    if F.shape[1] == 1:
+        return 1-F.min()
+    F = F[np.argsort(F[:,0])]
+    front = F[np.minimum.accumulate(F[:,1]) == F[:,1]]
+    return np.sum((np.append(front[1:,0], 1)-front[:,0])*(1-front[:,1]))
+
+
+### (true evaluations, quality) after every iteration ###
+def history(cls, options, problem, surrogate, itermax, seed):
+    name, fct, xbounds, ybounds, cbounds = problem
+    trace = []
+    optimizer = cls(fct, xbounds, ybounds, cbounds, seed=seed, surrogate=surrogate,
+                    callback=lambda o: trace.append((o.nEvaluations, quality(o.paretoArchive.f))), **options)
+    optimizer.iterate(itermax)
+    optimizer.close()
+    return np.array(trace)
+
+
+### True evaluations until the quality first reaches target ###
+def evaluationsTo(trace, target):
+    reached = np.nonzero(trace[:,1] >= target)[0]
+    return trace[reached[0], 0] if reached.size else np.nan
+
+
+if __name__ == "__main__":
+
+    results = []
+    for problem in PROBLEMS:
+        for cls, options in OPTIMIZERS:
+            for seed in range(3):
+                plain = history(cls, options, problem, None, 20, seed)
+                rbf = history(cls, options, problem, "rbf", 40, seed)
+
+                ### Budget of the plain run to reach 99% of its final quality ###
+                target = 0.99*plain[-1,1]
+                results.append((problem[0], cls.__name__, seed, plain[-1,1], rbf[-1,1], evaluationsTo(plain, target), evaluationsTo(rbf, target)))
+
+    for name, optimizer, seed, qplain, qrbf, nplain, nrbf in results:
+        print("{:11s} {:5s} seed={} quality plain: {:6.4f} rbf: {:6.4f}  evaluations to 99% of plain: {:5.0f} vs {:5.0f}".format(name, optimizer, seed, qplain, qrbf, nplain, nrbf))
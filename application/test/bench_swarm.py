@@ -0,0 +1,22 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from optimizer.swarm import Swarm
+from bench_helpers import parabolas
+
+
+if __name__ == "__main__":
+
+    for nparticles in [100, 1000, 10000, 100000]:
+        swarm = Swarm(parabolas, [(-4,4), (-4,4)], [(0,40), (0,40)], nparticles=nparticles, minimumSwarmSize=nparticles)
+
+        t0 = time.perf_counter()
+        swarm.iterate(5)
+        t = (time.perf_counter()-t0)/5
+        swarm.close()
+
+        print("nparticles={:7d} generation: {:9.2f} ms  per particle: {:6.2f} us".format(nparticles, 1e3*t, 1e6*t/nparticles))
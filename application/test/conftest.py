@@ -0,0 +1,20 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from application.common.database import Database
+
+
+### Scratch database per test, the pooled connections and PATH2DB are restored afterwards ###
+@pytest.fixture
+def database(tmp_path):
+    path2db = Database.PATH2DB
+    Database.close()
+    Database.PATH2DB = str(tmp_path / "test.db")
+    yield Database
+    Database.close()
+    Database.PATH2DB = path2db
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from optimizer.antcolony import ACO
+from bench_helpers import parabolas
+
+
+### Reference: sum_k |X[j,i]-X[k,i]| over all pairs, O(n^2) ###
+def absoluteDeviationSumsLoop(X):
+    return np.sum(np.abs(X[:,None,:]-X[None,:,:]), axis=1)
+
+
+@pytest.mark.parametrize("X", [np.random.default_rng(0).random((300, 5)),
+                               np.random.default_rng(1).integers(0, 3, (50, 3)).astype(float),
+                               np.ones((4, 2)),
+                               np.array([[0.5, 2.0]])])
+def test_absoluteDeviationSums(X):
+    assert np.allclose(ACO.absoluteDeviationSums(X), absoluteDeviationSumsLoop(X))
+
+
+### An ant drawn from archive row j follows N(xbest[j], eps*sum_k |xbest[j]-xbest[k]|), clipped to the bounds ###
+def test_construct():
+    aco = ACO(parabolas, [(-2,4), (-2,2)], [(0,20), (0,20)], colonySize=20000, archiveSize=3, eps=0.1, seed=42)
+    aco.xbest = np.array([[0.0, 0.0], [1.0, 0.5], [3.0, -1.0]])
+
+    x = aco.construct(np.array([0.0, 1.0, 0.0]))
+    assert x.shape == (20000, 2)
+    assert np.allclose(x.mean(axis=0), [1.0, 0.5], atol=0.01)
+    assert np.allclose(x.std(axis=0), 0.1*np.array([3.0, 2.0]), rtol=0.03)
+
+    aco.eps = 10.0
+    x = aco.construct(np.ones(3)/3)
+    assert np.all(x >= aco.xlb) and np.all(x <= aco.xub)
+    assert np.any(x == aco.xlb) and np.any(x == aco.xub)
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from optimizer.archive import EpsilonArchive
+from optimizer.archive import ParetoArchive
+from optimizer.pareto import Pareto
+
+
+### Reference: per box of the normalized objective space the row closest to the lower box corner, later rows win ties ###
+def bestPerBox(Y, ylb, yub, nbins):
+    bins = np.linspace(0, 1, nbins)
+    best = {}
+    for n, y in enumerate((Y-ylb)/(yub-ylb)):
+        inds = np.digitize(y, bins)
+        dist = np.sum((y-bins[np.clip(inds-1, 0, nbins-1)])**2)
+        key = tuple(inds)
+        if key not in best or dist <= best[key][0]:
+            best[key] = (dist, n)
+    return sorted(n for dist, n in best.values())
+
+
+def sortedRows(Y):
+    return Y[np.lexsort(Y.T[::-1])]
+
+
+##########################################################################
+### EpsilonArchive
+##########################################################################
+
+@pytest.mark.parametrize("ydim, nbins", [(2, 6), (2, 50), (3, 10)])
+def test_epsilonArchive(ydim, nbins):
+    rng = np.random.default_rng(nbins)
+    ylb, yub = -np.ones(ydim), 2*np.ones(ydim)
+    X, Y = rng.random((5000, 2)), ylb + rng.random((5000, ydim))*(yub-ylb)
+
+    ### Coarse values put many rows at the same distance in the same box ###
+    Y[:1000] = np.round(Y[:1000], 1)
+
+    reference = bestPerBox(Y, ylb, yub, nbins)
+    batch = EpsilonArchive(2, ylb, yub, nbins=nbins, capacity=4)
+    batch.add(X, Y)
+    assert len(batch) == len(reference)
+    assert np.array_equal(sortedRows(batch.y), sortedRows(Y[reference]))
+
+    ### Same designs one generation at a time, each box keeps the x of its y ###
+    incremental = EpsilonArchive(2, ylb, yub, nbins=nbins)
+    for i in range(0, 5000, 100):
+        incremental.add(X[i:i+100], Y[i:i+100])
+    assert np.array_equal(sortedRows(incremental.y), sortedRows(Y[reference]))
+    assert np.array_equal(sortedRows(np.hstack((incremental.y, incremental.x))), sortedRows(np.hstack((Y, X))[reference]))
+
+
+def test_epsilonArchiveClear():
+    archive = EpsilonArchive(1, [0, 0], [1, 1])
+    archive.add(np.zeros((3, 1)), np.array([[0.1, 0.9], [0.9, 0.1], [0.5, 0.5]]))
+    assert len(archive) == 3
+    archive.clear()
+    assert len(archive) == 0 and archive.y.shape == (0, 2)
+    archive.add(np.zeros((0, 1)), np.zeros((0, 2)))
+    assert len(archive) == 0
+
+
+##########################################################################
+### ParetoArchive
+##########################################################################
+
+### Unique rows of the first front of everything added so far ###
+def fullFront(F):
+    return np.unique(F[Pareto.nonDominatedSort(F)[0] == 0], axis=0)
+
+
+@pytest.mark.parametrize("ydim", [2, 3, 4])
+def test_paretoArchive(ydim):
+    rng = np.random.default_rng(ydim)
+    X, Y = rng.random((1000, 2)), rng.integers(0, 20, (1000, ydim)).astype(float)
+
+    archive = ParetoArchive(2, ydim, capacity=10**6)
+    for i in range(0, 1000, 100):
+        archive.add(X[i:i+100], Y[i:i+100])
+        assert np.array_equal(sortedRows(archive.y), fullFront(Y[:i+100]))
+    assert np.array_equal(archive.f, archive.y)
+
+    ### Every member keeps its own design ###
+    rows = {tuple(y): set() for y in archive.y.tolist()}
+    for x, y in zip(X.tolist(), Y.tolist()):
+        rows.get(tuple(y), set()).add(tuple(x))
+    assert all(tuple(x) in rows[tuple(y)] for x, y in zip(archive.x.tolist(), archive.y.tolist()))
+
+
+### Dominance is decided by F (e.g. penalized objectives), Y is only carried along ###
+def test_paretoArchivePenalized():
+    Y = np.array([[0, 0], [1, 2], [2, 1]], dtype=float)
+    F = Y + np.array([[10], [0], [0]])
+
+    archive = ParetoArchive(1, 2)
+    archive.add(np.arange(3).reshape(-1,1), Y, F)
+    assert sorted(archive.x[:,0].tolist()) == [1, 2]
+    assert np.array_equal(sortedRows(archive.y), Y[1:])
+
+
+### A full archive keeps the extremes and only members of the full front ###
+def test_paretoArchiveCapacity():
+    t = np.random.default_rng(0).random(500)
+    Y = np.column_stack((t, 1-t))
+    Y = np.vstack((Y, Y+0.1))
+
+    archive = ParetoArchive(1, 2, capacity=50)
+    for i in range(0, 1000, 100):
+        archive.add(np.zeros((100, 1)), Y[i:i+100])
+        assert len(archive) <= 50
+
+    assert len(archive) == 50
+    front = fullFront(Y)
+    assert all(any(np.array_equal(y, f) for f in front) for y in archive.y)
+    assert archive.y[:,0].min() == front[:,0].min() and archive.y[:,1].min() == front[:,1].min()
+
+    archive.clear()
+    assert len(archive) == 0
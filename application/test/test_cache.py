@@ -0,0 +1,54 @@
+from application.models.simulation.cache import ResultCache
+
+
+def test_hitsAndMisses():
+    cache = ResultCache(maxsize=10)
+    key = cache.key(1.1, 1.0, 5.0, 10.0, 2.0)
+
+    assert cache.get(key) is None
+    cache.put(key, (1, 2, 3, 4))
+    assert cache.get(key) == (1.0, 2.0, 3.0, 4.0)
+    assert cache.get(cache.key(1.1, 1.0, 5.0, 10.0, 2.0)) is not None
+    assert cache.stats() == {"size": 1, "maxsize": 10, "hits": 2, "misses": 1, "diskHits": 0}
+
+    cache.clear()
+    assert cache.stats() == {"size": 0, "maxsize": 10, "hits": 0, "misses": 0, "diskHits": 0}
+
+
+### Keys are quantized to the resolution, grid sizes are part of the key ###
+def test_key():
+    cache = ResultCache(resolution=1e-6)
+    assert cache.key(1.1, 1.0, 5.0, 10.0, 2.0) == cache.key(1.1+1e-9, 1.0, 5.0, 10.0, 2.0)
+    assert cache.key(1.1, 1.0, 5.0, 10.0, 2.0) != cache.key(1.1+1e-5, 1.0, 5.0, 10.0, 2.0)
+    assert cache.key(1.1, 1.0, 5.0, 10.0, 2.0, grid=(100, 100)) != cache.key(1.1, 1.0, 5.0, 10.0, 2.0)
+
+
+### The least recently used entry is evicted, a get counts as a use ###
+def test_lruEviction():
+    cache = ResultCache(maxsize=3)
+    cache.putMany([((n,), (n, n, n, n)) for n in range(3)])
+    assert cache.get((0,)) is not None
+
+    cache.put((3,), (3, 3, 3, 3))
+    assert cache.stats()["size"] == 3
+    assert cache.get((1,)) is None
+    assert [cache.get((n,)) is not None for n in [0, 2, 3]] == [True, True, True]
+
+    cache.put((4,), (4, 4, 4, 4))
+    assert cache.get((0,)) is None
+    assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 2
+
+
+### Entries evicted from memory are found in the SQLite tier ###
+def test_diskTier(database):
+    cache = ResultCache(maxsize=1, disk=True)
+    cache.putMany([((n,), (n, n, n, n)) for n in range(3)])
+    assert cache.stats()["size"] == 1
+
+    assert cache.get((0,)) == (0.0, 0.0, 0.0, 0.0)
+    assert cache.get((5,)) is None
+    assert cache.stats() == {"size": 1, "maxsize": 1, "hits": 1, "misses": 1, "diskHits": 1}
+
+    fresh = ResultCache(maxsize=10, disk=True)
+    assert fresh.get((1,)) == (1.0, 1.0, 1.0, 1.0)
+    assert fresh.stats()["diskHits"] == 1
@@ -0,0 +1,83 @@
+import numpy as np
+import os
+
+from optimizer.checkpoint import Checkpoint
+from optimizer.swarm import Swarm
+from bench_helpers import parabolas
+
+
+def test_saveAndLoad(tmp_path):
+    checkpoint = Checkpoint("run.npz", interval=2, directory=str(tmp_path))
+    assert not checkpoint.save(1, {"x": np.ones(3)})
+    assert checkpoint.save(2, {"x": np.arange(3)})
+    assert checkpoint.save(3, {"x": np.arange(4)}, force=True)
+
+    state = checkpoint.load()
+    assert np.array_equal(state["x"], np.arange(4))
+    assert checkpoint.lastIteration == 3
+    assert os.listdir(str(tmp_path)) == ["run.npz"]
+
+
+### The snapshot is copied on save, later changes of the state do not leak into the file ###
+def test_snapshotIsCopied(tmp_path):
+    x = np.zeros(5)
+    checkpoint = Checkpoint("run.npz", directory=str(tmp_path))
+    checkpoint.save(1, {"x": x})
+    x[:] = 1
+    assert np.array_equal(checkpoint.load()["x"], np.zeros(5))
+
+
+def test_closeRemovesFile(tmp_path):
+    checkpoint = Checkpoint(directory=str(tmp_path))
+    checkpoint.save(1, {"x": np.ones(3)})
+    checkpoint.close()
+    assert checkpoint.exists()
+
+    checkpoint.close(remove=True)
+    assert not checkpoint.exists()
+    assert os.listdir(str(tmp_path)) == []
+
+
+### Without filename and directory nothing is written ###
+def test_disabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    checkpoint = Checkpoint(interval=1)
+    assert not checkpoint.enabled
+    assert not checkpoint.save(1, {"x": np.ones(3)}, force=True)
+    assert not checkpoint.exists()
+    checkpoint.close(remove=True)
+
+    swarm = Swarm(parabolas, [(-2,4), (-2,2)], [(0,20), (0,20)], nparticles=10, seed=42)
+    swarm.iterate(3)
+    swarm.close(keepCheckpoint=True)
+    assert not swarm.checkpoint.exists()
+    assert swarm.history.shape[0] == 3
+    assert os.listdir(str(tmp_path)) == []
+
+
+### An interrupted run restarted from its checkpoint ends where an uninterrupted run does ###
+def test_restartFromSnapshot(tmp_path):
+    options = dict(nparticles=20, seed=42, checkpointDirectory=str(tmp_path))
+
+    straight = Swarm(parabolas, [(-2,4), (-2,2)], [(0,20), (0,20)], checkpoint="straight.npz", **options)
+    straight.iterate(5)
+    straight.close()
+    assert not os.path.exists(straight.checkpoint.filename)
+
+    interrupted = Swarm(parabolas, [(-2,4), (-2,2)], [(0,20), (0,20)], checkpoint="run.npz", checkpointInterval=2, **options)
+    interrupted.iterate(3)
+    interrupted.close(keepCheckpoint=True)
+    assert interrupted.checkpoint.exists()
+
+    restarted = Swarm(parabolas, [(-2,4), (-2,2)], [(0,20), (0,20)], checkpoint="run.npz", **options)
+    restarted.restart()
+    assert restarted.currentIteration == 3
+    assert restarted.nEvaluations == interrupted.nEvaluations
+    assert np.array_equal(restarted.x, interrupted.x)
+    assert np.array_equal(restarted.paretoArchive.y, interrupted.paretoArchive.y)
+
+    restarted.iterate(2)
+    restarted.close()
+    assert restarted.currentIteration == straight.currentIteration
+    assert np.allclose(restarted.paretoArchive.y, straight.paretoArchive.y)
+    assert not restarted.checkpoint.exists()
@@ -0,0 +1,155 @@
+import time
+import threading
+
+from application.common.database import BufferedWriter
+
+
+COLUMNS = {"id": "INTEGER PRIMARY KEY AUTOINCREMENT", "name": "TEXT", "price": "INT"}
+
+MIGRATIONS = [(1, ["CREATE INDEX IF NOT EXISTS idx_cars_name ON cars(name)"]),
+              (2, ["CREATE INDEX IF NOT EXISTS idx_cars_price ON cars(price)"])]
+
+
+def cars(n, start=0):
+    return [{"name": "car{}".format(k), "price": k} for k in range(start, start+n)]
+
+
+def count(database):
+    return len(database.find("cars", variables=["id"]))
+
+
+def indices(database):
+    return sorted(row["name"] for row in database.find("sqlite_master", variables=["name"], query={"type": ["=", "index"]}))
+
+
+##########################################################################
+### Connection pool
+##########################################################################
+
+### One connection per thread, reused by every call of that thread ###
+def test_connectionPerThread(database):
+    con = database.connect()
+    assert database.connect() is con
+    assert con.execute("PRAGMA journal_mode").fetchone()[0] == database.JOURNALMODE.lower()
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(database.connect()))
+    thread.start()
+    thread.join()
+    assert other[0] is not con
+    assert len(database._connections) == 2
+
+
+### Writes of one thread are visible to the others ###
+def test_sharedData(database):
+    database.create_table("cars", COLUMNS)
+    threads = [threading.Thread(target=database.insert, args=("cars", cars(1, start=k))) for k in range(4)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    assert sorted(row["price"] for row in database.find("cars")) == list(range(4))
+
+
+def test_close(database):
+    con = database.connect()
+    database.close()
+    assert database._connections == []
+    assert database.connect() is not con
+
+
+def test_withoutPool(database, monkeypatch):
+    monkeypatch.setattr(database, "POOL", False)
+    con = database.connect()
+    assert database.connect() is not con
+    con.close()
+
+
+##########################################################################
+### BufferedWriter
+##########################################################################
+
+def test_flushBySize(database):
+    database.create_table("cars", COLUMNS)
+    writer = BufferedWriter("cars", ["name", "price"], maxRows=10, maxDelay=3600)
+
+    writer.add(cars(9))
+    assert count(database) == 0 and len(writer.rows) == 9
+
+    writer.add(cars(1, start=9))
+    assert count(database) == 10 and writer.rows == []
+
+
+def test_flushByTime(database):
+    database.create_table("cars", COLUMNS)
+    writer = BufferedWriter("cars", ["name", "price"], maxRows=1000, maxDelay=0.05)
+
+    writer.add(cars(3))
+    assert count(database) == 0
+
+    time.sleep(0.06)
+    writer.add(cars(1, start=3))
+    assert count(database) == 4
+
+
+def test_flushOnClose(database):
+    database.create_table("cars", COLUMNS)
+    writer = BufferedWriter("cars", ["name", "price"], maxRows=1000, maxDelay=3600)
+
+    writer.add(cars(5))
+    assert count(database) == 0
+    assert writer.close()
+    assert [row["price"] for row in database.find("cars", orderBy="id")] == list(range(5))
+    assert writer.close()
+
+
+### A failed insert keeps the rows, in order, for the next flush ###
+def test_failedFlushKeepsRows(database):
+    writer = BufferedWriter("cars", ["name", "price"], maxRows=1000, maxDelay=3600)
+    writer.add(cars(3))
+    assert not writer.flush()
+    assert [row[1] for row in writer.rows] == [0, 1, 2]
+
+    writer.add(cars(2, start=3))
+    database.create_table("cars", COLUMNS)
+    assert writer.close()
+    assert [row["price"] for row in database.find("cars", orderBy="id")] == list(range(5))
+
+
+##########################################################################
+### Migrations
+##########################################################################
+
+def test_migrate(database):
+    database.create_table("cars", COLUMNS)
+    assert database.getSchemaVersion() == 0
+
+    assert database.migrate(MIGRATIONS[:1])
+    assert database.getSchemaVersion() == 1
+    assert indices(database) == ["idx_cars_name"]
+
+    assert database.migrate(MIGRATIONS)
+    assert database.getSchemaVersion() == 2
+    assert indices(database) == ["idx_cars_name", "idx_cars_price"]
+
+
+### Applied migrations are skipped, also after reconnecting ###
+def test_migrateIsIdempotent(database):
+    database.create_table("cars", COLUMNS)
+    assert database.migrate(MIGRATIONS)
+
+    database.close()
+    assert database.migrate(MIGRATIONS + [(1, ["DROP TABLE cars"])])
+    assert database.getSchemaVersion() == 2
+    assert database.find("cars") == []
+
+
+### A failing statement rolls back its whole migration, the earlier ones stay ###
+def test_migrateRollsBack(database):
+    database.create_table("cars", COLUMNS)
+    failing = [(3, ["CREATE INDEX idx_cars_both ON cars(name, price)", "CREATE INDEX idx_cars_missing ON nothing(name)"])]
+
+    assert not database.migrate(MIGRATIONS + failing)
+    assert database.getSchemaVersion() == 2
+    assert indices(database) == ["idx_cars_name", "idx_cars_price"]
+
+    assert not database.migrate(MIGRATIONS + failing)
+    assert database.getSchemaVersion() == 2
@@ -74,7 +74,7 @@ def animateSwarm(Xcine, Ycine, contourfct, xbounds, store=False):
     for const in constraints:
         plt.plot(const[0], const[1],'r--')
 
-    lines, colors = {}, plt.cm.get_cmap('RdBu')(np.linspace(0,1,Xcine.shape[1]))
+    lines, colors = {}, plt.get_cmap('RdBu')(np.linspace(0,1,Xcine.shape[1]))
     lines["title"] = ax.text(X.mean(),Y.max(), "Iter: 0")
     for color, p in zip(colors, range(Xcine.shape[1])):
         lines["particleBody_{}".format(p)] = ax.plot(Xcine[0,p,0], Xcine[0,p,1], '-', color=color)[0]
@@ -104,7 +104,7 @@ def animateSwarm2(Xcine, Ycine, xbounds, ybounds, store=False):
     fig = plt.figure()
     ax = plt.axes(xlim=ybounds[0], ylim=ybounds[1])
 
-    lines, colors = {}, plt.cm.get_cmap('RdBu')(np.linspace(0,1,Ycine.shape[1]))
+    lines, colors = {}, plt.get_cmap('RdBu')(np.linspace(0,1,Ycine.shape[1]))
     lines["title"] = ax.text(Ycine[0,:,0].mean(),Ycine[0,:,1].max(), "Iter: 0")
     for color, p in zip(colors, range(Xcine.shape[1])):
         lines["particleBody_{}".format(p)] = ax.plot(Ycine[0,p,0], Ycine[0,p,1], '-', color=color)[0]
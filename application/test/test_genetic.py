@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from optimizer.genetic import GA
+from bench_helpers import parabolas
+
+
+def ga(npop=20, xdim=2):
+    return GA(parabolas, [(-2,4)]*xdim, [(0,20), (0,20)], npop=npop, seed=42)
+
+
+### Distinct donors per trial vector, none of them the trial (target) index ###
+@pytest.mark.parametrize("nmembers, ndonors", [(40, 3), (40, 2), (4, 3), (25, 3)])
+def test_donorsExcludeTarget(nmembers, ndonors):
+    optimizer = ga()
+    donors = optimizer.donors(nmembers, ndonors)
+
+    assert donors.shape == (optimizer.npop, ndonors)
+    assert donors.min() >= 0 and donors.max() < nmembers
+    assert not np.any(donors == np.arange(optimizer.npop).reshape(-1,1))
+    assert all(len(set(row)) == ndonors for row in donors.tolist())
+
+
+### With one spare member the donors of the first rows are all the other members ###
+def test_donorsOfSmallPopulation():
+    donors = ga().donors(4, 3)
+    for i in range(4):
+        assert sorted(donors[i]) == [k for k in range(4) if k != i]
+
+
+### Every other member is a donor equally often ###
+def test_donorsAreUniform():
+    optimizer = ga(npop=5)
+    counts = np.zeros((5, 10))
+    for _ in range(2000):
+        donors = optimizer.donors(10, 3)
+        np.add.at(counts, (np.repeat(np.arange(5), 3), donors.reshape(-1)), 1)
+
+    assert np.all(counts[np.arange(5), np.arange(5)] == 0)
+    frequency = counts[~np.eye(5, 10, dtype=bool)].reshape(5, 9)/2000
+    assert np.allclose(frequency, 3/9, atol=0.04)
+
+
+def test_donorsNeedMembers():
+    with pytest.raises(AssertionError):
+        ga().donors(3, 3)
+
+
+### Trial vectors stay in the unit box, without crossover exactly one component is the mutant's ###
+@pytest.mark.parametrize("strategy", GA.STRATEGIES)
+def test_evolve(strategy):
+    optimizer = ga(npop=30, xdim=4)
+    xNorm = optimizer.rng.random((40, 4))
+    ranks = np.repeat([0, 1], 20)
+
+    trial = optimizer.evolve(xNorm, ranks, strategy=strategy)
+    assert trial.shape == (30, 4)
+    assert trial.min() >= 0 and trial.max() <= 1
+
+    trial = optimizer.evolve(xNorm, ranks, crossp=0.0, strategy=strategy)
+    assert np.all(np.sum(trial != xNorm[:30], axis=1) <= 1)
+    assert np.sum(trial != xNorm[:30]) > 25
@@ -0,0 +1,83 @@
+import time
+import threading
+
+from application.common.jobs import Job, JobQueue
+
+
+### Poll the status until the job is done ###
+def wait(job, timeout=5.0):
+    t0 = time.time()
+    while not job.done:
+        assert time.time()-t0 < timeout, "job {} still {}".format(job.id, job.status)
+        time.sleep(0.01)
+    return job
+
+
+def test_submitAndFinish():
+    jobs = JobQueue(nworkers=1)
+    job = jobs.submit(lambda job: job.update(0.5), name="test", caseid=3)
+
+    assert jobs.get(job.id) is job
+    assert wait(job).status == Job.FINISHED
+    assert job.progress == 1.0
+    assert job.started is not None and job.finished is not None
+    assert jobs.find(caseid=3) == [job] and jobs.find(caseid="3") == [job]
+    assert jobs.find(caseid=4) == []
+    assert job.json()["status"] == Job.FINISHED
+
+
+def test_failedJob():
+    def fail(job):
+        raise ValueError("boom")
+
+    job = wait(JobQueue(nworkers=1).submit(fail))
+    assert job.status == Job.FAILED
+    assert job.error == "boom"
+
+
+### A queued job never runs, a running one stops at its next progress update ###
+def test_cancel():
+    jobs = JobQueue(nworkers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def block(job):
+        started.set()
+        release.wait(5.0)
+        while job.update(0.5):
+            release.wait(0.01)
+
+    running = jobs.submit(block)
+    queued = jobs.submit(lambda job: job.update(1.0))
+    assert started.wait(5.0)
+    assert running.status == Job.RUNNING
+    assert queued.status == Job.QUEUED
+
+    assert jobs.cancel(queued.id) is queued
+    assert queued.status == Job.CANCELLED
+    assert jobs.cancel(running.id) is running
+    release.set()
+
+    assert wait(running).status == Job.CANCELLED
+    assert running.progress == 0.5
+    assert jobs.cancel("unknown") is None
+
+    ### The worker skips the cancelled job and takes the next one ###
+    assert wait(jobs.submit(lambda job: None)).status == Job.FINISHED
+    assert queued.started is None
+
+
+def test_instrumentationAttachedAtSubmit():
+    instrumentation = object()
+    job = JobQueue(nworkers=1).submit(lambda job: None, instrumentation=instrumentation)
+    assert job.instrumentation is instrumentation
+    wait(job)
+
+
+def test_maxHistory():
+    jobs = JobQueue(nworkers=1, maxHistory=2)
+    for _ in range(4):
+        wait(jobs.submit(lambda job: None))
+    last = jobs.submit(lambda job: None)
+    assert len(jobs.jobs) == 2
+    assert jobs.get(last.id) is last
+    wait(last)
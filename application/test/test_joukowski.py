@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from simulation.joukowski import JoukowskiAirfoil
+from simulation.joukowski import JoukowskiBatch
+from simulation.joukowski import JoukowskiGeometry
+from bench_joukowski import calculateFlowFieldLoop
+
+
+AIRFOILS = [dict(Uinf=20, R=1.25, alpha=14.0, beta=20.0), dict(Uinf=10, R=1.1, a=0.95, alpha=2.0, beta=5.0)]
+
+
+### The array kernel reproduces the node-by-node evaluation, singular nodes included ###
+@pytest.mark.parametrize("options", AIRFOILS)
+def test_flowFieldMatchesLoop(options):
+    sim = JoukowskiAirfoil(**options)
+    sim.calculateFlowField(nx=30, ny=20)
+
+    F, V = calculateFlowFieldLoop(sim, nx=30, ny=20)
+    finite = np.isfinite(V)
+    assert sim.F.shape == sim.V.shape == (30, 20)
+    assert np.allclose(F, sim.F)
+    assert np.array_equal(finite, np.isfinite(sim.V))
+    assert np.allclose(V[finite], sim.V[finite])
+
+
+### Lift and drag from the surface ring equal those of the full field ###
+@pytest.mark.parametrize("options", AIRFOILS)
+def test_surfaceMatchesField(options):
+    field = JoukowskiAirfoil(**options)
+    field.calculateFlowField(nx=200, ny=50)
+
+    surface = JoukowskiAirfoil(**options)
+    surface.calculateCoefficients(nx=200)
+    assert surface.F is None and surface.V.shape == (200, 1)
+    assert np.isclose(surface.lift, field.lift)
+    assert np.isclose(surface.drag, field.drag)
+    assert np.isclose(surface.chord, field.chord)
+
+
+### N designs x M operating points in one call equal N*M single solves ###
+@pytest.mark.parametrize("kutta", [False, True])
+def test_batchMatchesSingle(kutta):
+    rng = np.random.default_rng(42)
+    R, a, beta = 1.05+0.2*rng.random(5), 0.9+0.1*rng.random(5), 20*rng.random(5)
+    Uinf, alpha = [10.0, 20.0, 15.0], [2.0, 8.0, -4.0]
+
+    batch = JoukowskiBatch(Uinf=Uinf, R=R, a=a, alpha=alpha, beta=beta)
+    batch.calculateCoefficients(nx=200, kutta=kutta)
+    assert batch.lift.shape == batch.drag.shape == (5, 3)
+
+    for i in range(5):
+        for j in range(3):
+            sim = JoukowskiAirfoil(Uinf=Uinf[j], R=R[i], a=a[i], alpha=alpha[j], beta=beta[i])
+            sim.calculateCoefficients(nx=200, kutta=kutta)
+            assert np.isclose(batch.lift[i,j], sim.lift) and np.isclose(batch.drag[i,j], sim.drag)
+            assert np.isclose(batch.lift_coefficient[i,j], sim.lift_coefficient)
+
+
+### Operating points of one design share a read-only geometry, the results equal a cold solve ###
+def test_sharedGeometry():
+    options = [dict(Uinf=10, R=1.25, alpha=2.0, beta=20.0), dict(Uinf=20, R=1.25, alpha=8.0, beta=20.0)]
+    geo = [JoukowskiGeometry.get(JoukowskiAirfoil(**o), nx=40, ny=30) for o in options]
+    assert geo[0] is geo[1]
+    assert not geo[0].z1.flags.writeable and not geo[0].zeta.flags.writeable
+
+    for o in options:
+        shared = JoukowskiAirfoil(**o)
+        shared.calculateFlowField(nx=40, ny=30)
+        JoukowskiGeometry._cache.clear()
+        cold = JoukowskiAirfoil(**o)
+        cold.calculateFlowField(nx=40, ny=30)
+        assert np.array_equal(cold.F, shared.F, equal_nan=True)
+        assert cold.lift == shared.lift and cold.drag == shared.drag
+
+
+def test_geometryCacheIsBounded():
+    JoukowskiGeometry._cache.clear()
+    for n in range(JoukowskiGeometry.CACHESIZE+5):
+        JoukowskiGeometry.get(JoukowskiAirfoil(R=1.1+0.001*n), nx=10, ny=5)
+    assert len(JoukowskiGeometry._cache) == JoukowskiGeometry.CACHESIZE
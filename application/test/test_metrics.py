@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from optimizer.metrics import Metrics
+from optimizer.swarm import Swarm
+from bench_helpers import parabolas
+
+
+### Reference: share of uniform samples in [0, ref] dominated by any row of F ###
+def monteCarloHypervolume(F, ref, nsamples=200000, seed=1):
+    S = np.random.default_rng(seed).random((nsamples, F.shape[1]))*ref
+    dominated = np.zeros(nsamples, dtype=bool)
+    for f in F:
+        dominated |= np.all(S >= f, axis=1)
+    return np.prod(ref)*np.count_nonzero(dominated)/nsamples
+
+
+### Points on the unit sphere, some dominated ones and some beyond the reference point ###
+def front(n, ydim, seed=0):
+    F = np.abs(np.random.default_rng(seed).normal(size=(n, ydim)))
+    F = F/np.linalg.norm(F, axis=1, keepdims=True)
+    return np.vstack((F, F[:5]+0.1, F[:3]+2))
+
+
+@pytest.mark.parametrize("ydim", [2, 3, 4, 5])
+def test_hypervolume(ydim):
+    F, ref = front(50, ydim, seed=ydim), 1.2*np.ones(ydim)
+    exact = monteCarloHypervolume(F, ref)
+    assert Metrics.hypervolume(F, ref) == pytest.approx(exact, rel=0.02)
+
+
+def test_hypervolumeExact():
+    ref = np.array([4.0, 4.0])
+    assert Metrics.hypervolume(np.array([[1.0, 3.0], [2.0, 2.0], [3.0, 1.0], [3.0, 3.0]]), ref) == 6.0
+    assert Metrics.hypervolume(np.array([[1.0, 1.0, 1.0]]), np.array([2.0, 3.0, 4.0])) == 6.0
+    assert Metrics.hypervolume(np.array([[0.5]]), np.array([2.0])) == 1.5
+    assert Metrics.hypervolume(np.array([[5.0, 1.0]]), ref) == 0.0
+
+
+def test_igdAndSpread():
+    reference = np.column_stack((np.linspace(0, 1, 11), 1-np.linspace(0, 1, 11)))
+    assert Metrics.igd(reference, reference) == 0.0
+    assert Metrics.igd(reference+0.1, reference) == pytest.approx(0.1*np.sqrt(2))
+    assert Metrics.igd(np.zeros((0, 2)), reference) == np.inf
+
+    assert Metrics.spread(reference, reference) == pytest.approx(0.0)
+    assert Metrics.spread(reference[[0, 1, 2, 10]], reference) > 0.3
+    assert np.isnan(Metrics.spread(reference[:1]))
+
+
+### Iterations stop once the hypervolume gained over stagnationWindow iterations is below the tolerance ###
+def test_stagnationStopping():
+    options = dict(nparticles=20, seed=42)
+    fixed = Swarm(parabolas, [(-2,4), (-2,2)], [(0,20), (0,20)], **options)
+    fixed.iterate(15)
+    assert fixed.history.shape == (15, 5)
+    assert np.all(np.diff(fixed.history[:,2]) >= 0)
+
+    stopped = Swarm(parabolas, [(-2,4), (-2,2)], [(0,20), (0,20)], stagnationWindow=3, stagnationTolerance=1.0, **options)
+    stopped.iterate(15)
+    assert stopped.currentIteration == 4
+    assert np.array_equal(stopped.history, fixed.history[:4], equal_nan=True)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from optimizer.pareto import Pareto
+
+
+### Reference ranks: peel the rows nobody dominates, O(N^2) per front ###
+def bruteForceRanks(Y):
+    dominates = np.all(Y[:,None,:] <= Y[None,:,:], axis=2) & np.any(Y[:,None,:] < Y[None,:,:], axis=2)
+    ranks = np.full(Y.shape[0], -1)
+    rank = 0
+    while np.any(ranks < 0):
+        remaining = ranks < 0
+        front = remaining & ~np.any(dominates[remaining], axis=0)
+        ranks[front] = rank
+        rank += 1
+    return ranks
+
+
+### Continuous values, and small integers where ties and duplicates are frequent ###
+@pytest.mark.parametrize("ydim", [1, 2, 3, 4, 5])
+@pytest.mark.parametrize("ties", [False, True])
+def test_nonDominatedSort(ydim, ties):
+    rng = np.random.default_rng(ydim)
+    Y = rng.integers(0, 4, (300, ydim)).astype(float) if ties else rng.random((300, ydim))
+
+    ranks, fronts = Pareto.nonDominatedSort(Y)
+    assert np.array_equal(ranks, bruteForceRanks(Y))
+
+    assert len(fronts) == ranks.max()+1
+    assert np.array_equal(np.sort(np.concatenate(fronts)), np.arange(Y.shape[0]))
+    assert all(np.all(ranks[front] == k) for k, front in enumerate(fronts))
+
+
+def test_duplicatesShareFront():
+    Y = np.array([[1, 2], [1, 2], [2, 1], [1, 3], [1, 2]], dtype=float)
+    ranks, _ = Pareto.nonDominatedSort(Y)
+    assert ranks.tolist() == [0, 0, 0, 1, 0]
+
+
+def test_empty():
+    ranks, fronts = Pareto.nonDominatedSort(np.zeros((0, 2)))
+    assert ranks.shape == (0,) and fronts == []
+
+
+def test_paretoOptimalMember():
+    Y = np.random.default_rng(0).random((100, 3))
+    paretoIndex, dominatedIndex = Pareto.computeParetoOptimalMember(Y, index=np.arange(100, 200))
+    assert sorted(paretoIndex + dominatedIndex) == list(range(100, 200))
+    assert np.array_equal(np.asarray(paretoIndex)-100, np.nonzero(bruteForceRanks(Y) == 0)[0])
+
+
+def test_crowdingDistance():
+    assert Pareto.crowdingDistance(np.zeros((0, 2))).shape == (0,)
+
+    Y = np.array([[0, 4], [1, 2], [2, 1.5], [4, 0]], dtype=float)
+    distance = Pareto.crowdingDistance(Y)
+    assert np.all(np.isinf(distance[[0, 3]]))
+    assert np.allclose(distance[1:3], [2/4+2.5/4, 3/4+2/4])
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from optimizer.surrogate import RBFSurrogate
+from optimizer.swarm import Swarm
+from optimizer.genetic import GA
+from optimizer.antcolony import ACO
+from bench_helpers import binhAndKornFitness
+
+
+def samples(n, xdim=2, seed=0):
+    X = np.random.default_rng(seed).random((n, xdim))
+    Y = np.column_stack((np.sin(3*X[:,0])+X[:,1]**2, np.exp(-np.sum(X**2, axis=1))))
+    return X, Y
+
+
+### The model interpolates its samples and reproduces linear functions exactly (linear tail) ###
+def test_interpolation():
+    surrogate = RBFSurrogate()
+    X, Y = samples(60)
+    surrogate.add(X, Y)
+    assert surrogate.ready
+    assert np.allclose(surrogate.predict(X), Y, atol=1e-5)
+
+    linear = RBFSurrogate()
+    linear.add(X, 1+X @ np.array([[2.0], [-3.0]]))
+    Xtest = np.random.default_rng(1).random((100, 2))
+    assert np.allclose(linear.predict(Xtest), 1+Xtest @ np.array([[2.0], [-3.0]]), atol=1e-5)
+
+
+### Smooth functions are approximated away from the samples ###
+def test_accuracy():
+    surrogate = RBFSurrogate()
+    surrogate.add(*samples(200))
+    Xtest, Ytest = samples(100, seed=1)
+    assert np.max(np.abs(surrogate.predict(Xtest)-Ytest)) < 0.05
+
+
+### Non-finite rows are dropped, duplicates keep the newest value, only the newest maxSamples stay ###
+def test_add():
+    surrogate = RBFSurrogate(maxSamples=10)
+    assert not surrogate.ready
+
+    X = np.random.default_rng(0).random((8, 2))
+    surrogate.add(X, np.arange(8.0))
+    surrogate.add(X[:2], np.array([np.nan, 100.0]))
+    assert surrogate.X.shape[0] == 8
+    assert surrogate.Y[np.all(surrogate.X == X[1], axis=1), 0] == 100.0
+    assert surrogate.Y[np.all(surrogate.X == X[0], axis=1), 0] == 0.0
+
+    surrogate.add(np.random.default_rng(1).random((5, 2)), np.arange(5.0))
+    assert surrogate.X.shape[0] == 10
+    assert np.allclose(surrogate.distance(surrogate.X), 0)
+
+
+def test_ready():
+    surrogate = RBFSurrogate(minSamples=5)
+    surrogate.add(*samples(4))
+    assert not surrogate.ready
+    surrogate.add(*samples(1, seed=1))
+    assert surrogate.ready
+
+
+### Once trained, only surrogateFraction of every generation is evaluated with fct ###
+@pytest.mark.parametrize("cls, options", [(Swarm, dict(nparticles=40, minimumSwarmSize=40)), (GA, dict(npop=40)), (ACO, dict(colonySize=40, archiveSize=40))])
+def test_prescreening(cls, options):
+    optimizer = cls(binhAndKornFitness, [(0,5), (0,3)], [(0,140), (0,50)], [(0,25), (7.7,100)], seed=42,
+                    surrogate="rbf", surrogateFraction=0.25, **options)
+    optimizer.iterate(6)
+    optimizer.close()
+
+    assert 40+10 <= optimizer.nEvaluations < 6*40
+    assert optimizer.instrumentation.counters["predicted"] == 6*40-optimizer.nEvaluations
+    assert len(optimizer.paretoArchive) > 0
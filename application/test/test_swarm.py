@@ -5,11 +5,9 @@ import sys
 import os
 from matplotlib import animation
 
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../models'))
 
-from src.pipeline.graph import OptimizationGraph
-from src.optimizer.pareto import Pareto
-from src.optimizer.swarm import Swarm
+from optimizer.swarm import Swarm
 
 from test_functions import rosenbrock
 from test_functions import rosenbrockContour
@@ -18,6 +16,25 @@ from test_functions import binhAndKorn
 from test_functions import animateSwarm, animateSwarm2
 
 
+### Splits the responses into targets and constraints and records every generation for the animations ###
+class OptimizationGraph(object):
+    def __init__(self, xdim, rdim, tindex, cindex, xlabels=None, rlabels=None):
+        self.tindex, self.cindex = tindex, cindex
+        self.Xcine, self.Ycine = [], []
+
+    def singleProcessChain(self, fct):
+        self.fct = fct
+
+    def run(self, X):
+        R = self.fct(X)
+        self.Xcine.append(X.copy())
+        self.Ycine.append(R[:,self.tindex])
+        return R[:,self.tindex], R[:,self.cindex]
+
+    def postprocessAnimate(self):
+        return np.asarray(self.Xcine), np.asarray(self.Ycine)
+
+
 
 if __name__ == "__main__":
 
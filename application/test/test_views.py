@@ -0,0 +1,89 @@
+import pytest
+import threading
+
+from application import application, init_db
+from application.common.jobs import Job
+from application.models.simulation import views
+from application.config import DESIGNSCOLLECTION
+from application.models.simulation.digitaltwin import DESIGNCOLUMNS
+from bench_helpers import design
+from test_jobs import wait
+
+
+@pytest.fixture
+def client(database):
+    init_db()
+    return application.test_client()
+
+
+def addDesigns(database, caseid, n):
+    database.insertMany(DESIGNSCOLLECTION, [tuple(design(caseid)[key] for key in DESIGNCOLUMNS) for _ in range(n)], columnNames=DESIGNCOLUMNS)
+    return [row["id"] for row in database.find(DESIGNSCOLLECTION, variables=["id"], query={"caseid": ["=", caseid]}, orderBy="id")]
+
+
+def optiData(client, url):
+    response = client.post(url)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+### since is an id cursor: only designs of the case added after it are returned ###
+def test_optiDataSince(client, database):
+    ids = addDesigns(database, 1, 5)
+    addDesigns(database, 2, 3)
+
+    data = optiData(client, "/simulation/opti_data/1")
+    assert data["id"] == ids
+    assert set(data) == {"id", "liftOP1", "liftOP2", "dragOP1", "dragOP2", "R", "a", "beta"}
+
+    assert optiData(client, "/simulation/opti_data/1?since={}".format(ids[-1]))["id"] == []
+    assert optiData(client, "/simulation/opti_data/1?since={}".format(ids[2]))["id"] == ids[3:]
+
+    ids = addDesigns(database, 1, 2)
+    assert optiData(client, "/simulation/opti_data/1?since={}".format(ids[-3]))["id"] == ids[-2:]
+
+
+def test_optiDataLimit(client, database):
+    ids = addDesigns(database, 1, 5)
+    assert optiData(client, "/simulation/opti_data/1?limit=2")["id"] == ids[:2]
+    assert optiData(client, "/simulation/opti_data/1?since={}&limit=2".format(ids[1]))["id"] == ids[2:4]
+
+
+### Arguments that are no integers fall back to the defaults ###
+def test_optiDataInvalidArguments(client, database):
+    ids = addDesigns(database, 1, 3)
+    assert optiData(client, "/simulation/opti_data/1?since=abc&limit=xyz")["id"] == ids
+    assert optiData(client, "/simulation/opti_data/3")["id"] == []
+
+
+### Records the order of the plots, the first one blocks until released ###
+class SlowPlot(object):
+    def __init__(self, name, plotted, started=None, release=None):
+        self.name, self.plotted = name, plotted
+        self.started, self.release = started, release
+
+    def plot(self):
+        if self.started is not None:
+            self.started.set()
+            self.release.wait(5.0)
+        self.plotted.append(self.name)
+
+
+### A running render finishes before the newer one, renders submitted in between are dropped ###
+def test_rendersOfOneCaseAreSerialized():
+    plotted, started, release = [], threading.Event(), threading.Event()
+
+    old = views.submitRender("render-test", SlowPlot("old", plotted, started, release))
+    assert started.wait(5.0)
+    middle = views.submitRender("render-test", SlowPlot("middle", plotted))
+    new = views.submitRender("render-test", SlowPlot("new", plotted))
+    other = views.submitRender("render-other", SlowPlot("other", plotted))
+    assert new.status in [Job.QUEUED, Job.RUNNING]
+    release.set()
+
+    assert wait(new).status == Job.FINISHED
+    assert wait(old).status == Job.FINISHED
+    assert wait(middle).status == Job.CANCELLED
+    assert wait(other).status == Job.FINISHED
+    assert sorted(plotted) == ["new", "old", "other"]
+    assert plotted.index("old") < plotted.index("new")